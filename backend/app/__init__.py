@@ -2,3 +2,11 @@
 Application __init__.py
 """
 __version__ = "1.0.0"
+
+import os
+
+# The ML predictors run tiny single-sample GEMMs where extra OpenMP/MKL
+# threads only add fork/join overhead and oversubscribe cores under
+# concurrent requests. Must be set before torch/numpy are imported.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
@@ -2,7 +2,7 @@
 Database connection and session management.
 Uses SQLAlchemy with MySQL backend.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
@@ -18,6 +18,7 @@ engine = create_engine(
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,  # Verify connections before using them
+    pool_recycle=1800,  # Replace connections before MySQL's idle timeout drops them
     echo=settings.DEBUG,  # Log SQL queries in debug mode
 )
 
@@ -58,6 +59,26 @@ def init_db() -> None:
         raise
 
 
+def warm_db_pool(size: int = settings.DATABASE_POOL_SIZE) -> int:
+    """
+    Open up to `size` pooled connections so the first requests and
+    background tasks reuse established connections instead of connecting.
+    Returns the number of connections opened.
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Database pool warm-up stopped after {len(connections)} connections: {e}")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
 def check_db_connection() -> bool:
     """
     Check if database connection is working.
@@ -11,7 +11,10 @@ import logging
 import sys
 
 from app.config import settings
-from app.database import check_db_connection, init_db
+from app.database import check_db_connection, init_db, warm_db_pool
+from app.services.ml_generation import get_ml_service
+from app.services.http_client import close_client
+from app.utils.blockchain_utils import start_record_worker, stop_record_worker
 from app.routers import (
     auth,
     users,
@@ -75,10 +78,21 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
     
+    # Open the pool's connections up front for requests and background tasks
+    logger.info(f"Warmed {warm_db_pool()} database connections")
+    
+    # Load the building predictor now so the first generation request doesn't pay for it
+    get_ml_service()
+    
+    # Consumer for batched background blockchain records
+    start_record_worker()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await stop_record_worker()
+    await close_client()
 
 
 # Create FastAPI application
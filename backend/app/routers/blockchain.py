@@ -42,7 +42,7 @@ async def get_blockchain_status(
     Get blockchain service status.
     """
     blockchain_available = blockchain_service.is_available()
-    ipfs_available = ipfs_service.is_available()
+    ipfs_available = await ipfs_service.is_available()
     
     status_info = {
         "blockchain": {
@@ -88,7 +88,7 @@ async def store_project_on_blockchain(
             detail="Blockchain service is not available"
         )
     
-    if not ipfs_service.is_available():
+    if not await ipfs_service.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="IPFS service is not available"
@@ -328,7 +328,7 @@ async def get_ipfs_data(
     """
     Retrieve data from IPFS.
     """
-    if not ipfs_service.is_available():
+    if not await ipfs_service.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="IPFS service is not available"
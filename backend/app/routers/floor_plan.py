@@ -270,7 +270,7 @@ async def generate_complete_floor_plan(
         if include_3d_model:
             logger.info("Step 2/4: Generating 3D GLB model with ModelsLab...")
             modelslab = ModelsLabService()
-            model_result = modelslab.generate_3d_floor_plan(
+            model_result = await modelslab.generate_3d_floor_plan(
                 str(file_path),
                 prompt=f"3D architectural model, {prompt}, modern design",
                 include_360=include_360_tour
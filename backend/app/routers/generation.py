@@ -120,7 +120,7 @@ async def get_generation_status(
             params = job["params"]
             
             # Use ML model to predict optimal parameters
-            enhanced_params_json = ml_service.generate_blender_params(params)
+            enhanced_params_json = await ml_service.generate_blender_params_async(params)
             enhanced_params = json.loads(enhanced_params_json)
             enhanced_params['output_path'] = str(glb_path)
             enhanced_params['format'] = 'GLB'
@@ -13,7 +13,7 @@ import time
 import httpx
 import shutil
 
-from app.services.segmentation_service import SegmentationService
+from app.services.segmentation_service import SegmentationService, mask_bbox, materialize_mask
 from app.services.interior_inpainting_service import InteriorInpaintingService
 from app.dependencies.auth import get_current_user
 from app.models.user import User
@@ -128,8 +128,11 @@ async def detect_object_in_tour(
         # Save mask for later use
         mask_dir = Path("storage/temp/masks")
         mask_dir.mkdir(parents=True, exist_ok=True)
-        mask_path = mask_dir / f"{mask_id}.npy"
-        np.save(str(mask_path), seg_result['mask'])
+        mask_path = mask_dir / f"{mask_id}.npz"
+        np.savez(str(mask_path), **{
+            key: seg_result[key] for key in ('mask_packed', 'mask_rect', 'mask_shape')
+            if seg_result.get(key) is not None
+        })
         
         logger.info(f"Detected {object_info['object_type']}: {object_info['description']}")
         
@@ -177,27 +180,24 @@ async def replace_furniture_in_tour(
                 f.write(response.content)
         
         # Load saved mask
-        mask_path = Path(f"storage/temp/masks/{request.mask_id}.npy")
+        mask_path = Path(f"storage/temp/masks/{request.mask_id}.npz")
         if not mask_path.exists():
             raise HTTPException(
                 status_code=404, 
                 detail="Mask not found. Please detect object first using /detect-object endpoint."
             )
         
-        mask_array = np.load(str(mask_path))
+        with np.load(str(mask_path)) as saved:
+            mask_array = materialize_mask(dict(saved))
         
         # Get original object info (re-identify for context)
         segmentation_service = SegmentationService()
         
         # Find bbox from mask
-        coords = np.column_stack(np.where(mask_array > 0))
-        if len(coords) == 0:
+        bbox = mask_bbox(mask_array)
+        if bbox is None:
             raise HTTPException(status_code=400, detail="Invalid mask - no object detected")
         
-        y1, x1 = coords.min(axis=0)
-        y2, x2 = coords.max(axis=0)
-        bbox = [int(x1), int(y1), int(x2), int(y2)]
-        
         object_info = segmentation_service.identify_object_type(
             str(image_path),
             bbox
@@ -401,7 +401,7 @@ async def cleanup_temporary_files(
     Clean up temporary mask files after customization is complete.
     """
     try:
-        mask_path = Path(f"storage/temp/masks/{mask_id}.npy")
+        mask_path = Path(f"storage/temp/masks/{mask_id}.npz")
         if mask_path.exists():
             mask_path.unlink()
             logger.info(f"Cleaned up temporary mask: {mask_id}")
@@ -12,7 +12,6 @@ from app.models.user import User
 from app.models.project import Project
 from app.models.validation_report import ValidationReport
 from app.services.validation_service import validation_service
-from app.services.ml_service import ml_service
 from app.services.audit_service import AuditService
 from app.schemas.validation import ValidationRequest
 
@@ -70,7 +69,8 @@ async def validate_project(
         # Run UDA validation
         validation_result = validation_service.validate_project(project_data)
         
-        # Get ML recommendations
+        # Get ML recommendations (imported here so models load on first use)
+        from app.services.ml_service import ml_service
         ml_recommendations = ml_service.get_project_recommendations(project_data)
         
         # Save validation report
@@ -176,6 +176,8 @@ async def quick_compliance_check(
     }
     
     validation_result = validation_service.validate_project(project_data)
+    
+    from app.services.ml_service import ml_service
     ml_recommendations = ml_service.get_project_recommendations(project_data)
     
     return {
@@ -100,8 +100,17 @@ class BlockchainService:
     
     def calculate_hash(self, data: Dict[str, Any]) -> str:
         """Calculate SHA-256 hash of data."""
-        data_str = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        return self.hash_payload(self.serialize(data))
+    
+    @staticmethod
+    def serialize(data: Dict[str, Any]) -> bytes:
+        """Canonical (sorted-key) JSON bytes of data, as hashed by calculate_hash."""
+        return json.dumps(data, sort_keys=True).encode()
+    
+    @staticmethod
+    def hash_payload(payload: bytes) -> str:
+        """SHA-256 hex digest of already serialized data."""
+        return hashlib.sha256(payload).hexdigest()
     
     async def store_record(
         self,
@@ -0,0 +1,53 @@
+"""
+Shared HTTP clients for outbound API calls.
+
+One pooled httpx.AsyncClient per event loop, so repeated calls to the
+same host (ModelsLab, Replicate delivery) reuse keep-alive connections
+instead of paying a new TLS handshake each time. Synchronous services
+(SAM masks, Meshy) share one process-wide httpx.Client the same way.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Optional
+import httpx
+
+_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0)
+
+# Clients are bound to the loop they were first used on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the running loop's shared AsyncClient, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_LIMITS, timeout=30.0)
+        _clients[loop] = client
+    return client
+
+
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def get_sync_client() -> httpx.Client:
+    """Return the shared blocking Client (follows redirects like requests)"""
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(limits=_LIMITS, timeout=30.0, follow_redirects=True)
+        return _sync_client
+
+
+async def close_client():
+    """Close the running loop's shared client and the sync client (called on app shutdown)"""
+    global _sync_client
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
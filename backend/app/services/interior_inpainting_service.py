@@ -3,6 +3,8 @@ AI-Powered Interior Design Inpainting Service
 Allows users to replace furniture and change interior elements
 """
 import os
+import time
+import random
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
@@ -12,8 +14,48 @@ import io
 import numpy as np
 import base64
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _JPEG = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, RuntimeError):
+    # RuntimeError: PyTurboJPEG installed but libturbojpeg not found
+    _JPEG = None
+    TURBOJPEG_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Wall colors in OpenCV's BGR channel order
+_COLOR_MAP = {
+    'white': (255, 255, 255),
+    'beige': (220, 245, 245),
+    'gray': (180, 180, 180),
+    'light gray': (211, 211, 211),
+    'blue': (230, 216, 173),
+    'light blue': (230, 216, 173),
+    'green': (144, 238, 144),
+    'yellow': (224, 255, 255),
+    'pink': (203, 192, 255),
+    'cream': (208, 253, 255)
+}
+
+
+def _read_image_bgr(path: str) -> Optional[np.ndarray]:
+    """
+    Load an image as a BGR uint8 array.
+    JPEGs are decoded with libjpeg-turbo when PyTurboJPEG is installed,
+    everything else goes through cv2.imread.
+    """
+    if TURBOJPEG_AVAILABLE and Path(path).suffix.lower() in ('.jpg', '.jpeg'):
+        try:
+            with open(path, 'rb') as f:
+                return _JPEG.decode(f.read(), pixel_format=TJPF_BGR)
+        except OSError as e:
+            logger.warning(f"TurboJPEG decode failed, falling back to OpenCV: {e}")
+    
+    import cv2
+    return cv2.imread(path)
+
 
 class InteriorInpaintingService:
     """Service for AI-powered furniture replacement and interior design"""
@@ -64,7 +106,7 @@ class InteriorInpaintingService:
             logger.info(f"Loaded image: {original_img.size}")
             
             # Create mask image (white = replace, black = keep)
-            mask_img = Image.fromarray((mask_array * 255).astype('uint8'))
+            mask_img = Image.fromarray(mask_array.astype(np.uint8, copy=False) * 255)
             
             # Resize to optimal size for SDXL (1024x1024 or maintain aspect ratio)
             max_size = 1024
@@ -75,17 +117,14 @@ class InteriorInpaintingService:
             new_size = (int(original_size[0] * ratio), int(original_size[1] * ratio))
             
             original_resized = original_img.resize(new_size, Image.LANCZOS)
-            mask_resized = mask_img.resize(new_size, Image.NEAREST)
+            mask_resized = self._downsample_mask(mask_img, new_size)
             
-            # Save temporary files
-            temp_dir = Path(output_path).parent
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            temp_original = temp_dir / "temp_original.png"
-            temp_mask = temp_dir / "temp_mask.png"
-            
-            original_resized.save(temp_original)
-            mask_resized.save(temp_mask)
+            # Encode both inputs in memory; PNG level 1 is ~3x cheaper than
+            # the default with a negligible size penalty for photos
+            img_buf = io.BytesIO()
+            mask_buf = io.BytesIO()
+            original_resized.save(img_buf, 'PNG', compress_level=1)
+            mask_resized.save(mask_buf, 'PNG', compress_level=1)
             
             # Build enhanced prompt
             enhanced_prompt = self._build_inpainting_prompt(
@@ -96,26 +135,24 @@ class InteriorInpaintingService:
             logger.info(f"Inpainting with prompt: {enhanced_prompt}")
             
             # Run SDXL Inpainting
-            with open(temp_original, "rb") as img_file, \
-                 open(temp_mask, "rb") as mask_file:
-                
-                # Convert to base64 data URIs
-                img_b64 = base64.b64encode(img_file.read()).decode()
-                mask_b64 = base64.b64encode(mask_file.read()).decode()
-                
-                output = replicate.run(
-                    self.inpainting_model,
-                    input={
-                        "image": f"data:image/png;base64,{img_b64}",
-                        "mask": f"data:image/png;base64,{mask_b64}",
-                        "prompt": enhanced_prompt,
-                        "negative_prompt": "low quality, blurry, distorted, unrealistic, bad furniture, deformed, ugly, inconsistent lighting, mismatched perspective, watermark, text",
-                        "num_inference_steps": 30,
-                        "guidance_scale": 7.5,
-                        "strength": 0.99,
-                        "num_outputs": 1
-                    }
-                )
+            # Convert to base64 data URIs
+            img_b64 = base64.b64encode(img_buf.getbuffer()).decode()
+            mask_b64 = base64.b64encode(mask_buf.getbuffer()).decode()
+            
+            output = self._run_with_retry(
+                replicate,
+                self.inpainting_model,
+                {
+                    "image": f"data:image/png;base64,{img_b64}",
+                    "mask": f"data:image/png;base64,{mask_b64}",
+                    "prompt": enhanced_prompt,
+                    "negative_prompt": "low quality, blurry, distorted, unrealistic, bad furniture, deformed, ugly, inconsistent lighting, mismatched perspective, watermark, text",
+                    "num_inference_steps": 30,
+                    "guidance_scale": 7.5,
+                    "strength": 0.99,
+                    "num_outputs": 1
+                }
+            )
             
             # Download result
             if isinstance(output, list):
@@ -131,12 +168,9 @@ class InteriorInpaintingService:
             
             # Resize back to original size
             final_img = result_img.resize(original_size, Image.LANCZOS)
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
             final_img.save(output_path)
             
-            # Cleanup temporary files
-            temp_original.unlink(missing_ok=True)
-            temp_mask.unlink(missing_ok=True)
-            
             logger.info(f"Inpainting successful: {output_path}")
             
             return {
@@ -154,6 +188,35 @@ class InteriorInpaintingService:
                 output_path
             )
     
+    def _downsample_mask(self, mask_img: Image.Image, new_size: tuple) -> Image.Image:
+        """
+        Shrink a binary mask by box-averaging and re-thresholding.
+        
+        Unlike a NEAREST resize this keeps thin object parts that fall
+        between sampled pixels, and gives smoother mask edges.
+        """
+        k = max(1, mask_img.size[0] // new_size[0])
+        if k > 1:
+            mask_img = mask_img.reduce(k).point(lambda p: 255 if p > 32 else 0)
+        if mask_img.size != new_size:
+            mask_img = mask_img.resize(new_size, Image.NEAREST)
+        return mask_img
+    
+    def _run_with_retry(self, replicate, model: str, model_input: Dict[str, Any], max_retries: int = 5):
+        """
+        Call replicate.run, backing off with jitter when Replicate
+        rate-limits (429) or is temporarily unavailable (503).
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return replicate.run(model, input=model_input)
+            except replicate.exceptions.ReplicateError as e:
+                if getattr(e, 'status', None) not in (429, 503) or attempt == max_retries:
+                    raise
+                delay = random.uniform(0.5, 1.5) * 2 ** attempt
+                logger.warning(f"Replicate busy ({e.status}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
     def _build_inpainting_prompt(
         self, 
         replacement_prompt: str, 
@@ -188,7 +251,7 @@ class InteriorInpaintingService:
             import cv2
             
             # Load image
-            img = cv2.imread(original_image_path)
+            img = _read_image_bgr(original_image_path)
             if img is None:
                 raise ValueError("Could not load image")
             
@@ -235,45 +298,26 @@ class InteriorInpaintingService:
             import cv2
             
             # Load image
-            img = cv2.imread(original_image_path)
+            img = _read_image_bgr(original_image_path)
             if img is None:
                 raise ValueError("Could not load image")
             
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            
-            # Color mapping
-            color_map = {
-                'white': (255, 255, 255),
-                'beige': (245, 245, 220),
-                'gray': (180, 180, 180),
-                'light gray': (211, 211, 211),
-                'blue': (173, 216, 230),
-                'light blue': (173, 216, 230),
-                'green': (144, 238, 144),
-                'yellow': (255, 255, 224),
-                'pink': (255, 192, 203),
-                'cream': (255, 253, 208)
-            }
-            
-            target_color = np.array(color_map.get(new_color.lower(), (255, 255, 255)))
+            # Blend directly in OpenCV's BGR order; the map is stored as BGR
+            target_color = np.array(_COLOR_MAP.get(new_color.lower(), (255, 255, 255)))
             
             # Create colored version
-            colored = img_rgb.copy()
-            mask_3d = np.stack([wall_mask] * 3, axis=-1)
+            colored = img.copy()
             
             # Apply color with blending to preserve shadows/highlights
             alpha = 0.6
             colored[wall_mask] = (
                 alpha * target_color + 
-                (1 - alpha) * img_rgb[wall_mask]
+                (1 - alpha) * img[wall_mask]
             ).astype('uint8')
             
-            # Convert back to BGR
-            result_bgr = cv2.cvtColor(colored, cv2.COLOR_RGB2BGR)
-            
             # Save
             Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-            cv2.imwrite(output_path, result_bgr)
+            cv2.imwrite(output_path, colored)
             
             logger.info(f"Wall color changed: {output_path}")
             
@@ -4,13 +4,30 @@ Supports multiple IPFS providers: Pinata, Web3.Storage, and local IPFS node.
 """
 import os
 import json
+import time
+import random
+import asyncio
 import logging
 import httpx
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, BinaryIO, Tuple
 from io import BytesIO
 
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Statuses that mean "slow down" rather than "failed"
+RETRYABLE_STATUS = (429, 503)
+MAX_UPLOAD_RETRIES = 5
+MAX_CONCURRENT_UPLOADS = 8
+
+# How long a content hash -> CID mapping is trusted before re-uploading
+CID_CACHE_TTL = 86400  # seconds
+
 
 class IPFSService:
     """Service for storing and retrieving data from IPFS."""
@@ -37,21 +54,46 @@ class IPFSService:
         else:
             self.provider = 'local'
             logger.info(f"IPFS provider: Local node at {self.ipfs_api_url}")
+        
+        # Cap in-flight uploads so bursts queue here instead of being rate-limited
+        self._sem = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+        
+        # (checked_at, available) for the local node probe
+        self._avail_cache: Optional[Tuple[float, bool]] = None
+        self._avail_ttl = 30.0
+        
+        # Redis remembers the CID of content already pinned, so identical
+        # payloads aren't uploaded again
+        self.redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        self._redis = None
     
-    def is_available(self) -> bool:
-        """Check if IPFS service is available."""
+    async def is_available(self) -> bool:
+        """
+        Check if IPFS service is available.
+        
+        Pinata/Web3.Storage only need credentials; the local node is probed
+        asynchronously and the result is cached for a short TTL so health
+        checks and upload preconditions don't hit the node every request.
+        """
         if self.provider == 'pinata':
             return bool(self.pinata_api_key and self.pinata_secret)
         elif self.provider == 'web3storage':
             return bool(self.web3_storage_token)
-        else:
-            # Check local node
-            try:
-                import httpx
-                response = httpx.get(f"{self.ipfs_api_url}/api/v0/id", timeout=5)
-                return response.status_code == 200
-            except:
-                return False
+        
+        now = time.monotonic()
+        if self._avail_cache and now - self._avail_cache[0] < self._avail_ttl:
+            return self._avail_cache[1]
+        
+        # Check local node
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{self.ipfs_api_url}/api/v0/id", timeout=5)
+                available = response.status_code == 200
+        except Exception:
+            available = False
+        
+        self._avail_cache = (now, available)
+        return available
     
     async def upload_json(self, data: Dict[str, Any], filename: str = "data.json") -> Optional[str]:
         """
@@ -67,7 +109,72 @@ class IPFSService:
         json_str = json.dumps(data, indent=2)
         json_bytes = json_str.encode('utf-8')
         
-        return await self.upload_file(BytesIO(json_bytes), filename)
+        return await self.upload_bytes(json_bytes, filename)
+    
+    async def upload_bytes(
+        self,
+        payload: bytes,
+        filename: str,
+        content_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Upload already serialized data to IPFS.
+        
+        Args:
+            payload: File content
+            filename: Name for the file
+            content_hash: Digest of payload; when given, a CID cached for
+                the same content is returned without uploading again
+            
+        Returns:
+            IPFS CID if successful
+        """
+        cache_key = f"ipfs:{self.provider}:{content_hash}" if content_hash else None
+        if cache_key:
+            cid = await self._get_cached_cid(cache_key)
+            if cid:
+                logger.info(f"Reused IPFS CID {cid} for unchanged {filename}")
+                return cid
+        
+        cid = await self.upload_file(BytesIO(payload), filename)
+        
+        if cid and cache_key:
+            await self._cache_cid(cache_key, cid)
+        return cid
+    
+    def _get_redis(self):
+        """Lazily created Redis client for the CID cache, or None."""
+        if not REDIS_AVAILABLE:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1.0,
+                socket_timeout=1.0
+            )
+        return self._redis
+    
+    async def _get_cached_cid(self, cache_key: str) -> Optional[str]:
+        """CID cached for cache_key; a Redis failure counts as a miss."""
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            return await client.get(cache_key)
+        except Exception as e:
+            logger.warning(f"IPFS CID cache lookup failed: {e}")
+            return None
+    
+    async def _cache_cid(self, cache_key: str, cid: str) -> None:
+        """Remember cid for cache_key for CID_CACHE_TTL seconds (best effort)."""
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.setex(cache_key, CID_CACHE_TTL, cid)
+        except Exception as e:
+            logger.warning(f"IPFS CID cache store failed: {e}")
     
     async def upload_file(self, file: BinaryIO, filename: str) -> Optional[str]:
         """
@@ -87,14 +194,47 @@ class IPFSService:
         else:
             return await self._upload_to_local(file, filename)
     
+    async def _post_with_retry(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        file: BinaryIO,
+        filename: str,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        POST a file upload, retrying with jittered exponential backoff
+        when the provider answers 429/503.
+        
+        The file is rewound before every attempt and the number of
+        concurrent uploads is capped by the service semaphore.
+        """
+        async with self._sem:
+            for attempt in range(MAX_UPLOAD_RETRIES + 1):
+                file.seek(0)
+                response = await client.post(
+                    url,
+                    files={'file': (filename, file, 'application/octet-stream')},
+                    **kwargs
+                )
+                if response.status_code not in RETRYABLE_STATUS or attempt == MAX_UPLOAD_RETRIES:
+                    return response
+                
+                try:
+                    retry_after = float(response.headers.get('retry-after', 0))
+                except ValueError:
+                    retry_after = 0.0
+                delay = max(retry_after, random.uniform(0.5, 1.5) * 2 ** attempt)
+                logger.warning(
+                    f"IPFS upload rate-limited ({response.status_code}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_UPLOAD_RETRIES})"
+                )
+                await asyncio.sleep(delay)
+    
     async def _upload_to_pinata(self, file: BinaryIO, filename: str) -> Optional[str]:
         """Upload file to Pinata."""
         try:
             async with httpx.AsyncClient() as client:
-                files = {
-                    'file': (filename, file, 'application/octet-stream')
-                }
-                
                 headers = {
                     'pinata_api_key': self.pinata_api_key,
                     'pinata_secret_api_key': self.pinata_secret
@@ -119,9 +259,11 @@ class IPFSService:
                     'pinataMetadata': json.dumps(pinata_metadata)
                 }
                 
-                response = await client.post(
+                response = await self._post_with_retry(
+                    client,
                     'https://api.pinata.cloud/pinning/pinFileToIPFS',
-                    files=files,
+                    file,
+                    filename,
                     data=data,
                     headers=headers,
                     timeout=300
@@ -144,17 +286,15 @@ class IPFSService:
         """Upload file to Web3.Storage."""
         try:
             async with httpx.AsyncClient() as client:
-                files = {
-                    'file': (filename, file, 'application/octet-stream')
-                }
-                
                 headers = {
                     'Authorization': f'Bearer {self.web3_storage_token}'
                 }
                 
-                response = await client.post(
+                response = await self._post_with_retry(
+                    client,
                     'https://api.web3.storage/upload',
-                    files=files,
+                    file,
+                    filename,
                     headers=headers,
                     timeout=300
                 )
@@ -176,13 +316,11 @@ class IPFSService:
         """Upload file to local IPFS node."""
         try:
             async with httpx.AsyncClient() as client:
-                files = {
-                    'file': (filename, file, 'application/octet-stream')
-                }
-                
-                response = await client.post(
+                response = await self._post_with_retry(
+                    client,
                     f'{self.ipfs_api_url}/api/v0/add',
-                    files=files,
+                    file,
+                    filename,
                     timeout=300
                 )
                 
@@ -4,11 +4,27 @@ Uses trained PyTorch model to predict optimal building parameters
 """
 import torch
 import torch.nn as nn
+import os
 import json
+import pickle
+import asyncio
+import hashlib
+import platform
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple
 import numpy as np
 
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
 
 class BuildingParameterPredictor(nn.Module):
     """Neural network for predicting optimal building parameters"""
@@ -32,51 +48,478 @@ class BuildingParameterPredictor(nn.Module):
         return self.network(x)
 
 
+NUM_FEATURES = 10
+
+# One intra-op thread per request (see app/__init__.py); interop threads
+# can only be set before the first parallel op, so skip if too late
+torch.set_num_threads(int(os.getenv("OMP_NUM_THREADS", "1")))
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    pass
+
+# Opt-in: compile the fp32 predictor with torch.compile instead of the
+# int8 TorchScript path (needs a C++ toolchain for Inductor at load time)
+USE_TORCH_COMPILE = os.getenv("ML_TORCH_COMPILE", "").lower() in ("1", "true", "yes") and hasattr(torch, "compile")
+
+# Opt-in: export the fp32 predictor to ONNX and run it with onnxruntime
+USE_ONNX_RUNTIME = os.getenv("ML_ONNX_RUNTIME", "").lower() in ("1", "true", "yes") and ONNXRUNTIME_AVAILABLE
+
+# Async micro-batching of concurrent predictions
+BATCH_MAX_SIZE = 32
+BATCH_MAX_WAIT_MS = 5
+
+# Predictions memoized per rounded input (see _prediction_key)
+PREDICTION_CACHE_SIZE = 1024
+
+# Map project type to numeric
+_PROJECT_TYPE_CODES = {
+    'RESIDENTIAL': 0,
+    'COMMERCIAL': 1,
+    'MIXED_USE': 2,
+    'INDUSTRIAL': 3
+}
+
+def _prediction_key(params: Dict[str, Any]) -> Tuple:
+    """
+    Round inputs to the precision the model can distinguish so that
+    near-identical requests share a cache entry: site area to 10 m²,
+    coverage to 1%, dimensions to 0.5 m.
+    """
+    def half(value) -> float:
+        return round(float(value) * 2) / 2
+    
+    return (
+        round(float(params.get('site_area', 1000)) / 10) * 10,
+        round(float(params.get('building_coverage', 30))),
+        int(params.get('num_floors', 10)),
+        half(params.get('width', 20)),
+        half(params.get('depth', 15)),
+        half(params.get('height', 30)),
+        params.get('project_type', 'RESIDENTIAL')
+    )
+
+
+def _key_params(key: Tuple) -> Dict[str, Any]:
+    """Model inputs for a _prediction_key tuple"""
+    site_area, building_coverage, num_floors, width, depth, height, project_type = key
+    return {
+        'site_area': site_area,
+        'building_coverage': building_coverage,
+        'num_floors': num_floors,
+        'width': width,
+        'depth': depth,
+        'height': height,
+        'project_type': project_type
+    }
+
+
+# abs(prediction) * scale + offset, clamped to [lo, hi], for model outputs 0-6:
+# window_size, window_spacing, facade_detail_level, -, -, entrance_width, material_quality
+_POST_SCALE = np.array([2.0, 3.0, 5.0, 0.0, 0.0, 3.0, 1.0])
+_POST_OFFSET = np.array([0.0, 2.5, 0.0, 0.0, 0.0, 2.5, 0.0])
+_POST_LO = np.array([0.8, 2.0, 1.0, 0.0, 0.0, 2.0, 0.5])
+_POST_HI = np.array([2.5, 4.0, 5.0, 0.0, 0.0, 5.0, 1.0])
+
+# Fields passed to the Blender script, in output order, with their defaults
+_BLENDER_DEFAULTS = {
+    # Basic dimensions
+    'width': 20,
+    'depth': 15,
+    'height': 30,
+    'num_floors': 10,
+    
+    # Site parameters
+    'site_area': 1000,
+    'building_coverage': 30,
+    
+    # ML-enhanced details
+    'window_size': 1.5,
+    'window_spacing': 3.0,
+    'facade_detail_level': 3,
+    'roof_type': 'flat',
+    'balcony_enabled': True,
+    'entrance_width': 2.5,
+    'material_quality': 0.8,
+    'architectural_style': 'contemporary',
+    
+    # Type and compliance
+    'project_type': 'RESIDENTIAL',
+    'min_open_space': 700,
+    'max_building_height': 75,
+    
+    # Output settings
+    'output_path': 'output.glb',
+    'format': 'GLB'
+}
+
+# Caller-supplied values that may arrive as Decimal/int/str from the DB or request
+_BLENDER_INPUT_CASTS = (
+    ('width', float),
+    ('depth', float),
+    ('height', float),
+    ('num_floors', int),
+    ('site_area', float),
+    ('building_coverage', float),
+    ('min_open_space', float),
+    ('max_building_height', float),
+    # Passed through from the caller as-is (project_type may be None)
+    ('project_type', str),
+    ('output_path', str),
+    ('format', str)
+)
+
+
+class _DecimalEncoder(json.JSONEncoder):
+    """Serialize Decimal (DB numerics) and NumPy scalars during json.dumps"""
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+
+# Rule-based defaults used when the ML model is unavailable
+_RULE_TEMPLATES = {
+    'RESIDENTIAL': MappingProxyType({
+        'window_size': 1.5,
+        'window_spacing': 3.0,
+        'facade_detail_level': 3,
+        'roof_type': 'sloped',
+        'balcony_enabled': True,
+        'entrance_width': 2.5,
+        'material_quality': 0.8,
+        'architectural_style': 'contemporary'
+    }),
+    'COMMERCIAL': MappingProxyType({
+        'window_size': 2.0,
+        'window_spacing': 2.5,
+        'facade_detail_level': 4,
+        'roof_type': 'flat',
+        'balcony_enabled': False,
+        'entrance_width': 4.0,
+        'material_quality': 0.9,
+        'architectural_style': 'modern'
+    }),
+    'MIXED_USE': MappingProxyType({
+        'window_size': 1.8,
+        'window_spacing': 2.8,
+        'facade_detail_level': 4,
+        'roof_type': 'flat',
+        'balcony_enabled': True,
+        'entrance_width': 3.5,
+        'material_quality': 0.85,
+        'architectural_style': 'mixed'
+    })
+}
+
+# Shared by MLEnhancedGenerationService and ml_service.MLService
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent.parent.parent / "ml_models" / "deployed_model.pt"
+
+
+def _strip_dropout(network: nn.Sequential) -> nn.Sequential:
+    """Drop Dropout layers (identity in eval mode; they hold no parameters)"""
+    return nn.Sequential(*[layer for layer in network if not isinstance(layer, nn.Dropout)])
+
+
+@torch.no_grad()
+def _fold_batchnorm(network: nn.Sequential) -> nn.Sequential:
+    """
+    Fold eval-mode BatchNorm1d layers into linear weights.
+    
+    Here BN follows the ReLU, so the preceding Linear can't absorb it.
+    As an affine map y = a*x + c it folds into the *next* Linear instead
+    (Dropout in between is identity in eval): W' = W*a, b' = W@c + b.
+    Returns the network unchanged if a BN has no Linear to fold into.
+    """
+    folded = []
+    pending = None  # (scale, shift) of a BN waiting for the next Linear
+    for layer in network:
+        if isinstance(layer, nn.BatchNorm1d) and pending is None:
+            scale = torch.rsqrt(layer.running_var + layer.eps)
+            shift = -layer.running_mean * scale
+            if layer.affine:
+                scale = scale * layer.weight
+                shift = shift * layer.weight + layer.bias
+            pending = (scale, shift)
+            continue
+        
+        if pending is not None:
+            if isinstance(layer, nn.Dropout):
+                folded.append(layer)
+                continue
+            if not isinstance(layer, nn.Linear):
+                return network
+            
+            scale, shift = pending
+            fused = nn.Linear(layer.in_features, layer.out_features)
+            fused.weight.copy_(layer.weight * scale)
+            bias = layer.bias if layer.bias is not None else 0
+            fused.bias.copy_(layer.weight @ shift + bias)
+            layer = fused
+            pending = None
+        
+        folded.append(layer)
+    
+    return network if pending is not None else nn.Sequential(*folded)
+
+
+def _optimize_for_inference(model: nn.Module, input_dim: int) -> nn.Module:
+    """
+    Trace and freeze the eval-mode model so each prediction skips
+    Python per-op dispatch. The network is a plain feed-forward stack,
+    so tracing on the fixed (1, input_dim) input gives a leaner graph
+    than scripting. Falls back to the eager model on failure.
+    """
+    try:
+        example = torch.zeros(1, input_dim, dtype=torch.float32)
+        traced = torch.jit.trace(model, example, strict=False, check_trace=False)
+        traced = torch.jit.freeze(traced)
+        traced = torch.jit.optimize_for_inference(traced)
+        
+        # The JIT profiles the first calls; pay that here, not on a request
+        with torch.inference_mode():
+            for _ in range(2):
+                traced(example)
+        return traced
+    except Exception as e:
+        print(f"⚠ TorchScript optimization failed, using eager model: {e}")
+        return model
+
+
+def _quantize_dynamic(model: nn.Module) -> nn.Module:
+    """Swap Linear layers for int8-weight kernels; keep fp32 if unsupported"""
+    try:
+        if platform.machine().lower() in ('x86_64', 'amd64') and \
+                'fbgemm' in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = 'fbgemm'
+        return torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    except Exception as e:
+        print(f"⚠ Dynamic quantization failed, using fp32 model: {e}")
+        return model
+
+
+def _checkpoint_digest(path: Path) -> str:
+    """Short SHA-256 of the checkpoint's content, for keying derived models"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _quantized_cache_path(path: Path) -> Path:
+    """Serialized int8 model location next to the checkpoint, keyed by its content hash"""
+    return path.with_name(f"{path.stem}.{_checkpoint_digest(path)}.int8.ts")
+
+
+def _load_quantized_cache(path: Path) -> Optional[Tuple[nn.Module, Dict[str, Any]]]:
+    """Load the int8 TorchScript model built from this exact checkpoint, if any"""
+    cache_path = _quantized_cache_path(path)
+    if not cache_path.exists():
+        return None
+    try:
+        extra_files = {'feature_stats.json': ''}
+        model = torch.jit.load(str(cache_path), map_location='cpu', _extra_files=extra_files)
+        return model, json.loads(extra_files['feature_stats.json'] or '{}')
+    except Exception as e:
+        print(f"⚠ Ignoring unreadable quantized model cache {cache_path}: {e}")
+        return None
+
+
+def _save_quantized_cache(path: Path, model: nn.Module, feature_stats: Dict[str, Any]):
+    """Serialize the optimized int8 model so later loads skip re-quantization"""
+    try:
+        stats_json = json.dumps(feature_stats, default=lambda o: o.tolist())
+        torch.jit.save(model, str(_quantized_cache_path(path)), _extra_files={'feature_stats.json': stats_json})
+    except Exception as e:
+        print(f"⚠ Could not cache quantized model: {e}")
+
+
+def _compile_for_inference(model: nn.Module, input_dim: int) -> nn.Module:
+    """
+    Compile with torch.compile(mode="reduce-overhead"). The async
+    micro-batcher sends any batch size up to BATCH_MAX_SIZE, so the batch
+    dimension is compiled dynamic rather than recompiling per size.
+    Compilation takes a while, so it is triggered here by warm-up calls
+    rather than by the first request: batch 1 gets its own specialized
+    graph, batch 2 builds the dynamic one every larger size reuses.
+    """
+    try:
+        compiled = torch.compile(model, mode="reduce-overhead", dynamic=True)
+        with torch.inference_mode():
+            for batch_size in (1, 1, 2, 2):
+                compiled(torch.zeros(batch_size, input_dim))
+        return compiled
+    except Exception as e:
+        print(f"⚠ torch.compile failed, falling back to TorchScript: {e}")
+        return _optimize_for_inference(model, input_dim)
+
+
+class _OnnxPredictor:
+    """Callable stand-in for the torch model, backed by an onnxruntime session"""
+    def __init__(self, session: "ort.InferenceSession"):
+        self.session = session
+    
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        # x aliases a NumPy buffer on CPU, so .numpy() does not copy
+        return torch.from_numpy(self.session.run(None, {'x': x.numpy()})[0])
+
+
+def _onnx_cache_path(path: Path) -> Path:
+    """ONNX export location next to the checkpoint, keyed by its content hash"""
+    return path.with_name(f"{path.stem}.{_checkpoint_digest(path)}.onnx")
+
+
+def _load_onnx_predictor(path: Path, model: nn.Module, input_dim: int) -> Optional[_OnnxPredictor]:
+    """
+    Export the eval-mode model to ONNX (once per checkpoint) and open a
+    single-threaded onnxruntime session on it. Returns None on failure.
+    """
+    try:
+        onnx_path = _onnx_cache_path(path)
+        if not onnx_path.exists():
+            # Batch axis stays dynamic for the async micro-batching path
+            torch.onnx.export(
+                model,
+                (torch.zeros(1, input_dim),),
+                str(onnx_path),
+                opset_version=17,
+                input_names=['x'],
+                output_names=['y'],
+                dynamic_axes={'x': {0: 'batch'}, 'y': {0: 'batch'}},
+                dynamo=False
+            )
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = 1
+        session = ort.InferenceSession(str(onnx_path), sess_options=options, providers=['CPUExecutionProvider'])
+        return _OnnxPredictor(session)
+    except Exception as e:
+        print(f"⚠ ONNX Runtime export failed, using TorchScript: {e}")
+        return None
+
+
+def load_shared_predictor(model_path: Optional[str] = None) -> Tuple[Optional[nn.Module], Dict[str, Any]]:
+    """
+    Load the building predictor checkpoint once per process.
+    
+    Args:
+        model_path: Checkpoint path; defaults to DEFAULT_MODEL_PATH
+    
+    Returns:
+        (optimized eval-mode model, feature_stats), or (None, {}) if the
+        checkpoint does not exist. Load errors are raised to the caller.
+    """
+    # Normalize the path so every spelling of it shares one cache entry
+    return _load_predictor(str(Path(model_path or DEFAULT_MODEL_PATH).resolve()))
+
+
+@lru_cache(maxsize=1)
+def _load_predictor(model_path: str) -> Tuple[Optional[nn.Module], Dict[str, Any]]:
+    """Cached loader behind load_shared_predictor, keyed by the resolved path"""
+    path = Path(model_path)
+    if not path.exists():
+        print(f"⚠ Model file not found: {path}")
+        return None, {}
+    
+    cached = None if USE_TORCH_COMPILE or USE_ONNX_RUNTIME else _load_quantized_cache(path)
+    if cached is not None:
+        print(f"Loading quantized ML model for {path}")
+        return cached
+    
+    print(f"Loading ML model from {path}")
+    try:
+        # mmap keeps tensor storage in the page cache instead of copying it
+        checkpoint = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    except pickle.UnpicklingError as e:
+        # Older checkpoints may carry non-tensor objects (e.g. NumPy stats)
+        print(f"⚠ Checkpoint is not weights-only, loading with full unpickler: {e}")
+        checkpoint = torch.load(path, map_location='cpu', weights_only=False)
+    
+    # Initialize model architecture
+    feature_stats = {}
+    if isinstance(checkpoint, dict) and 'model_state_dict' in checkpoint:
+        input_dim = checkpoint.get('input_dim', 10)
+        hidden_dim = checkpoint.get('hidden_dim', 128)
+        model = BuildingParameterPredictor(input_dim, hidden_dim)
+        model.load_state_dict(checkpoint['model_state_dict'])
+        feature_stats = checkpoint.get('feature_stats', {})
+    else:
+        # Assume it's just the state dict
+        input_dim = 10
+        model = BuildingParameterPredictor()
+        model.load_state_dict(checkpoint)
+    
+    model.eval()
+    model.network = _fold_batchnorm(_strip_dropout(model.network))
+    if USE_TORCH_COMPILE:
+        return _compile_for_inference(model, input_dim), feature_stats
+    if USE_ONNX_RUNTIME:
+        onnx_model = _load_onnx_predictor(path, model, input_dim)
+        if onnx_model is not None:
+            return onnx_model, feature_stats
+    
+    quantized = _quantize_dynamic(model)
+    optimized = _optimize_for_inference(quantized, input_dim)
+    # Only cache a genuinely int8, TorchScript model; either step may
+    # have fallen back to its input
+    if quantized is not model and isinstance(optimized, torch.jit.ScriptModule):
+        _save_quantized_cache(path, optimized, feature_stats)
+    return optimized, feature_stats
+
+
 class MLEnhancedGenerationService:
     """Service for ML-enhanced 3D building generation"""
     
-    def __init__(self, model_path: str = "ml_models/deployed_model.pt"):
+    def __init__(self, model_path: str = str(DEFAULT_MODEL_PATH)):
         self.model_path = Path(model_path)
         self.model = None
         self.feature_stats = None
+        
+        # Reused per call: the input tensor aliases the feature buffer, so
+        # filling the buffer is all it takes to feed the model
+        self._feat_buf = np.empty((1, NUM_FEATURES), dtype=np.float32)
+        self._input_tensor = torch.from_numpy(self._feat_buf)
+        self._mean = np.zeros((1, NUM_FEATURES), dtype=np.float32)
+        self._std = np.ones((1, NUM_FEATURES), dtype=np.float32)
+        self._lock = threading.Lock()
+        
+        # Predictions are deterministic, so repeated inputs skip the model.
+        # Shared by the sync and async paths, keyed by _prediction_key.
+        self._prediction_cache: "OrderedDict[Tuple, Tuple[float, ...]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Micro-batching for the async path, created on first use in the running loop
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        
         self.load_model()
     
     def load_model(self):
-        """Load the trained PyTorch model"""
+        """Load the trained PyTorch model (shared with ml_service)"""
         try:
-            if self.model_path.exists():
-                print(f"Loading ML model from {self.model_path}")
-                checkpoint = torch.load(self.model_path, map_location='cpu', weights_only=False)
-                
-                # Initialize model architecture
-                if isinstance(checkpoint, dict) and 'model_state_dict' in checkpoint:
-                    input_dim = checkpoint.get('input_dim', 10)
-                    hidden_dim = checkpoint.get('hidden_dim', 128)
-                    self.model = BuildingParameterPredictor(input_dim, hidden_dim)
-                    self.model.load_state_dict(checkpoint['model_state_dict'])
-                    self.feature_stats = checkpoint.get('feature_stats', {})
-                else:
-                    # Assume it's just the state dict
-                    self.model = BuildingParameterPredictor()
-                    self.model.load_state_dict(checkpoint)
-                
-                self.model.eval()
+            self.model, self.feature_stats = load_shared_predictor(str(self.model_path))
+            if self.feature_stats:
+                self._mean[0] = self.feature_stats.get('mean', self._mean[0])
+                self._std[0] = np.asarray(self.feature_stats.get('std', self._std[0])) + 1e-8
+            if self.model is not None:
                 print("✓ ML model loaded successfully")
             else:
-                print(f"⚠ Model file not found: {self.model_path}")
                 print("Using rule-based parameter enhancement")
-                self.model = None
         except Exception as e:
             print(f"✗ Failed to load ML model: {e}")
             print("Using rule-based parameter enhancement")
             self.model = None
     
     def normalize_features(self, features: np.ndarray) -> np.ndarray:
-        """Normalize input features"""
+        """Normalize input features in place"""
         if self.feature_stats:
-            mean = np.array(self.feature_stats.get('mean', [0] * len(features)))
-            std = np.array(self.feature_stats.get('std', [1] * len(features)))
-            return (features - mean) / (std + 1e-8)
+            np.subtract(features, self._mean, out=features)
+            np.divide(features, self._std, out=features)
         return features
     
     def predict_building_parameters(self, input_params: Dict[str, Any]) -> Dict[str, Any]:
@@ -96,23 +539,18 @@ class MLEnhancedGenerationService:
         Returns:
             Enhanced parameters with ML predictions
         """
-        # Extract and normalize input features
-        features = self._extract_features(input_params)
-        
         if self.model is None:
             # Fallback: Use rule-based enhancement
             print("Using standard planning rules for parameter enhancement")
             return self._rule_based_enhancement(input_params)
         
         try:
-            # Prepare input tensor
-            features_normalized = self.normalize_features(features)
-            input_tensor = torch.FloatTensor(features_normalized).unsqueeze(0)
-            
-            # Make prediction
-            with torch.no_grad():
-                predictions = self.model(input_tensor)
-                predictions = predictions.squeeze().numpy()
+            key = _prediction_key(input_params)
+            cached = self._cached_prediction(key)
+            if cached is None:
+                cached = self._predict_raw(key)
+                self._cache_prediction(key, cached)
+            predictions = np.asarray(cached)
             
             # Post-process predictions
             enhanced_params = self._post_process_predictions(input_params, predictions)
@@ -124,44 +562,149 @@ class MLEnhancedGenerationService:
             print(f"✗ ML prediction failed: {e}")
             return self._rule_based_enhancement(input_params)
     
-    def _extract_features(self, params: Dict[str, Any]) -> np.ndarray:
-        """Extract normalized features from input parameters"""
-        # Map project type to numeric
-        project_type_map = {
-            'RESIDENTIAL': 0,
-            'COMMERCIAL': 1,
-            'MIXED_USE': 2,
-            'INDUSTRIAL': 3
-        }
+    def _cached_prediction(self, key: Tuple) -> Optional[Tuple[float, ...]]:
+        """Memoized model output for a _prediction_key, or None"""
+        with self._cache_lock:
+            predictions = self._prediction_cache.get(key)
+            if predictions is not None:
+                self._prediction_cache.move_to_end(key)
+            return predictions
+    
+    def _cache_prediction(self, key: Tuple, predictions: Tuple[float, ...]):
+        """Memoize a model output, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._prediction_cache[key] = predictions
+            self._prediction_cache.move_to_end(key)
+            if len(self._prediction_cache) > PREDICTION_CACHE_SIZE:
+                self._prediction_cache.popitem(last=False)
+    
+    def _predict_raw(self, key: Tuple) -> Tuple[float, ...]:
+        """Run the model for one rounded input (a _prediction_key tuple)"""
+        # The feature buffer and input tensor are shared between calls
+        with self._lock:
+            self.normalize_features(self._extract_features(_key_params(key)))
+            
+            # Make prediction
+            with torch.inference_mode():
+                predictions = self.model(self._input_tensor)
+                return tuple(predictions.squeeze().tolist())
+    
+    async def predict_building_parameters_async(self, input_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of predict_building_parameters.
         
-        features = np.array([
-            params.get('site_area', 1000) / 10000,  # Normalize by 10,000 m²
-            params.get('building_coverage', 30) / 100,
-            params.get('num_floors', 10) / 50,
-            params.get('width', 20) / 100,
-            params.get('depth', 15) / 100,
-            params.get('height', 30) / 200,
-            project_type_map.get(params.get('project_type', 'RESIDENTIAL'), 0) / 3,
-            params.get('site_area', 1000) * params.get('building_coverage', 30) / 100 / 10000,  # Built area
-            params.get('width', 20) / params.get('depth', 15) if params.get('depth', 15) > 0 else 1,  # Aspect ratio
-            params.get('height', 30) / params.get('num_floors', 10) if params.get('num_floors', 10) > 0 else 3  # Floor height
-        ])
+        Inputs are rounded and memoized exactly as in the sync path; cache
+        misses arriving within BATCH_MAX_WAIT_MS of each other are run
+        through the model as a single (B, NUM_FEATURES) batch.
+        """
+        if self.model is None:
+            print("Using standard planning rules for parameter enhancement")
+            return self._rule_based_enhancement(input_params)
         
-        return features
+        try:
+            key = _prediction_key(input_params)
+            cached = self._cached_prediction(key)
+            if cached is None:
+                queue = self._get_batch_queue()
+                row = self._extract_features(_key_params(key), out=np.empty((1, NUM_FEATURES), dtype=np.float32))
+                future = asyncio.get_running_loop().create_future()
+                await queue.put((row, future))
+                cached = tuple((await future).tolist())
+                self._cache_prediction(key, cached)
+            predictions = np.asarray(cached)
+            
+            enhanced_params = self._post_process_predictions(input_params, predictions)
+            print(f"✓ ML predictions generated for {input_params.get('project_type', 'UNKNOWN')} building")
+            return enhanced_params
+            
+        except Exception as e:
+            print(f"✗ ML prediction failed: {e}")
+            return self._rule_based_enhancement(input_params)
+    
+    def _get_batch_queue(self) -> asyncio.Queue:
+        """
+        Queue of the batch worker for the running loop, (re)starting the
+        worker if it is missing, has died, or belongs to another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._batch_task is None or self._batch_task.done() or self._batch_loop is not loop:
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = loop.create_task(self._batch_worker(self._batch_queue))
+            self._batch_loop = loop
+        return self._batch_queue
+    
+    async def _batch_worker(self, queue: asyncio.Queue):
+        """Drain queued feature rows in batches and resolve each request's future"""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await queue.get()]
+            deadline = loop.time() + BATCH_MAX_WAIT_MS / 1000
+            while len(items) < BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                batch = self.normalize_features(np.concatenate([row for row, _ in items]))
+                with torch.inference_mode():
+                    predictions = self.model(torch.from_numpy(batch)).numpy()
+                for (_, future), row_predictions in zip(items, predictions):
+                    if not future.done():
+                        future.set_result(row_predictions)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def _extract_features(self, params: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Write model features for params into out (default: the shared feature buffer)"""
+        if out is None:
+            out = self._feat_buf
+        
+        site_area = params.get('site_area', 1000)
+        coverage = params.get('building_coverage', 30)
+        num_floors = params.get('num_floors', 10)
+        width = params.get('width', 20)
+        depth = params.get('depth', 15)
+        height = params.get('height', 30)
+        
+        f = out[0]
+        f[0] = site_area / 10000  # Normalize by 10,000 m²
+        f[1] = coverage / 100
+        f[2] = num_floors / 50
+        f[3] = width / 100
+        f[4] = depth / 100
+        f[5] = height / 200
+        f[6] = _PROJECT_TYPE_CODES.get(params.get('project_type', 'RESIDENTIAL'), 0) / 3
+        f[7] = site_area * coverage / 100 / 10000  # Built area
+        f[8] = width / depth if depth > 0 else 1  # Aspect ratio
+        f[9] = height / num_floors if num_floors > 0 else 3  # Floor height
+        
+        return out
     
     def _post_process_predictions(self, input_params: Dict[str, Any], predictions: np.ndarray) -> Dict[str, Any]:
         """Post-process ML predictions to ensure valid building parameters"""
         enhanced = input_params.copy()
         
-        # Predicted enhancements
-        enhanced['window_size'] = max(0.8, min(2.5, abs(predictions[0]) * 2))
-        enhanced['window_spacing'] = max(2.0, min(4.0, abs(predictions[1]) * 3 + 2.5))
-        enhanced['facade_detail_level'] = max(1, min(5, int(abs(predictions[2]) * 5)))
-        enhanced['roof_type'] = 'flat' if predictions[3] > 0 else 'sloped'
-        enhanced['balcony_enabled'] = predictions[4] > 0
-        enhanced['entrance_width'] = max(2.0, min(5.0, abs(predictions[5]) * 3 + 2.5))
-        enhanced['material_quality'] = max(0.5, min(1.0, abs(predictions[6])))
-        enhanced['architectural_style'] = self._determine_style(predictions[7], input_params.get('project_type'))
+        # Predicted enhancements: scale and clamp outputs 0-6 in one pass
+        # (roof/balcony slots 3-4 are read as signs below, not clamped)
+        scaled = np.abs(predictions[:7]) * _POST_SCALE + _POST_OFFSET
+        np.clip(scaled, _POST_LO, _POST_HI, out=scaled)
+        window_size, window_spacing, detail_level, _, _, entrance_width, material_quality = scaled.tolist()
+        raw = predictions.tolist()
+        
+        enhanced['window_size'] = window_size
+        enhanced['window_spacing'] = window_spacing
+        enhanced['facade_detail_level'] = int(detail_level)
+        enhanced['roof_type'] = 'flat' if raw[3] > 0 else 'sloped'
+        enhanced['balcony_enabled'] = raw[4] > 0
+        enhanced['entrance_width'] = entrance_width
+        enhanced['material_quality'] = material_quality
+        enhanced['architectural_style'] = self._determine_style(raw[7], input_params.get('project_type'))
         
         # Compliance-aware adjustments
         enhanced['min_open_space'] = input_params.get('site_area', 1000) * (1 - input_params.get('building_coverage', 30) / 100)
@@ -180,43 +723,8 @@ class MLEnhancedGenerationService:
     
     def _rule_based_enhancement(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback rule-based parameter enhancement when ML is unavailable"""
-        enhanced = params.copy()
         project_type = params.get('project_type', 'RESIDENTIAL')
-        
-        # Rule-based defaults
-        if project_type == 'RESIDENTIAL':
-            enhanced.update({
-                'window_size': 1.5,
-                'window_spacing': 3.0,
-                'facade_detail_level': 3,
-                'roof_type': 'sloped',
-                'balcony_enabled': True,
-                'entrance_width': 2.5,
-                'material_quality': 0.8,
-                'architectural_style': 'contemporary'
-            })
-        elif project_type == 'COMMERCIAL':
-            enhanced.update({
-                'window_size': 2.0,
-                'window_spacing': 2.5,
-                'facade_detail_level': 4,
-                'roof_type': 'flat',
-                'balcony_enabled': False,
-                'entrance_width': 4.0,
-                'material_quality': 0.9,
-                'architectural_style': 'modern'
-            })
-        else:  # MIXED_USE
-            enhanced.update({
-                'window_size': 1.8,
-                'window_spacing': 2.8,
-                'facade_detail_level': 4,
-                'roof_type': 'flat',
-                'balcony_enabled': True,
-                'entrance_width': 3.5,
-                'material_quality': 0.85,
-                'architectural_style': 'mixed'
-            })
+        enhanced = {**params, **_RULE_TEMPLATES.get(project_type, _RULE_TEMPLATES['MIXED_USE'])}
         
         # Compliance calculations
         enhanced['min_open_space'] = params.get('site_area', 1000) * (1 - params.get('building_coverage', 30) / 100)
@@ -226,53 +734,21 @@ class MLEnhancedGenerationService:
     
     def generate_blender_params(self, input_params: Dict[str, Any]) -> str:
         """Generate complete parameters JSON for Blender script"""
-        enhanced = self.predict_building_parameters(input_params)
-        
-        # Convert Decimal to float for JSON serialization
-        def convert_decimals(obj):
-            if isinstance(obj, dict):
-                return {k: convert_decimals(v) for k, v in obj.items()}
-            elif hasattr(obj, '__iter__') and not isinstance(obj, str):
-                return [convert_decimals(item) for item in obj]
-            elif hasattr(obj, 'is_integer'):  # Decimal
-                return float(obj)
-            return obj
-        
-        enhanced = convert_decimals(enhanced)
-        
-        # Format for Blender script
-        blender_params = {
-            # Basic dimensions
-            'width': float(enhanced.get('width', 20)),
-            'depth': float(enhanced.get('depth', 15)),
-            'height': float(enhanced.get('height', 30)),
-            'num_floors': int(enhanced.get('num_floors', 10)),
-            
-            # Site parameters
-            'site_area': float(enhanced.get('site_area', 1000)),
-            'building_coverage': float(enhanced.get('building_coverage', 30)),
-            
-            # ML-enhanced details
-            'window_size': float(enhanced.get('window_size', 1.5)),
-            'window_spacing': float(enhanced.get('window_spacing', 3.0)),
-            'facade_detail_level': int(enhanced.get('facade_detail_level', 3)),
-            'roof_type': str(enhanced.get('roof_type', 'flat')),
-            'balcony_enabled': bool(enhanced.get('balcony_enabled', True)),
-            'entrance_width': float(enhanced.get('entrance_width', 2.5)),
-            'material_quality': float(enhanced.get('material_quality', 0.8)),
-            'architectural_style': str(enhanced.get('architectural_style', 'contemporary')),
-            
-            # Type and compliance
-            'project_type': str(enhanced.get('project_type', 'RESIDENTIAL')),
-            'min_open_space': float(enhanced.get('min_open_space', 700)),
-            'max_building_height': float(enhanced.get('max_building_height', 75)),
-            
-            # Output settings
-            'output_path': str(enhanced.get('output_path', 'output.glb')),
-            'format': str(enhanced.get('format', 'GLB'))
-        }
+        return self._format_blender_params(self.predict_building_parameters(input_params))
+    
+    async def generate_blender_params_async(self, input_params: Dict[str, Any]) -> str:
+        """Async variant of generate_blender_params using batched predictions"""
+        return self._format_blender_params(await self.predict_building_parameters_async(input_params))
+    
+    def _format_blender_params(self, enhanced: Dict[str, Any]) -> str:
+        """Serialize enhanced parameters into the JSON the Blender script expects"""
+        # Format for Blender script. Model/rule outputs already have the
+        # right types; only caller-supplied numerics are normalized.
+        blender_params = {k: enhanced.get(k, default) for k, default in _BLENDER_DEFAULTS.items()}
+        for key, cast in _BLENDER_INPUT_CASTS:
+            blender_params[key] = cast(blender_params[key])
         
-        return json.dumps(blender_params, indent=2)
+        return json.dumps(blender_params, indent=2, cls=_DecimalEncoder)
 
 
 # Global singleton instance
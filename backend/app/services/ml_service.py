@@ -3,7 +3,7 @@ ML Service for model predictions and recommendations.
 Loads and uses deployed ML models for urban planning recommendations.
 """
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
 # Optional imports
@@ -33,15 +33,53 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # Model paths (relative to project root)
 MODEL_DIR = Path(__file__).resolve().parent.parent.parent.parent
-PYTORCH_MODEL_PATH = MODEL_DIR / "deployed_model.pt"
 CLF_MODEL_PATH = MODEL_DIR / "clf_requires_open_space.pkl"
 REG_MODEL_PATH = MODEL_DIR / "reg_min_open_space_m2.pkl"
+# Both open space models merged into one graph by scripts/convert_open_space_to_onnx.py
+OPEN_SPACE_ONNX_PATH = MODEL_DIR / "open_space.onnx"
 FEATURE_COLUMNS_PATH = MODEL_DIR / "feature_columns.json"
 
+# Simple numeric encoding of project_type for the open space models
+_TYPE_MAP = {
+    'RESIDENTIAL': 1,
+    'COMMERCIAL': 2,
+    'INDUSTRIAL': 3,
+    'MIXED_USE': 4,
+    'INSTITUTIONAL': 5
+}
+
+# Compliance tips, precombined per project type
+_BASE_TIPS = (
+    "Ensure all setback requirements are met",
+    "Verify building coverage does not exceed maximum allowed",
+    "Check floor area ratio compliance",
+    "Provide adequate parking spaces as per UDA regulations",
+    "Ensure proper waste management facilities",
+    "Include fire safety measures and emergency exits"
+)
+_TIPS_BY_TYPE = {
+    'RESIDENTIAL': _BASE_TIPS + (
+        "Provide minimum 15% open space for landscaping",
+        "Ensure adequate natural ventilation in all units",
+        "Include recreational facilities for residents"
+    ),
+    'COMMERCIAL': _BASE_TIPS + (
+        "Provide adequate loading/unloading areas",
+        "Ensure accessibility compliance for persons with disabilities",
+        "Include proper signage and wayfinding"
+    )
+}
+
 
 class MLService:
     """Machine Learning service for urban planning predictions."""
@@ -51,46 +89,37 @@ class MLService:
         self.pytorch_model = None
         self.clf_model = None
         self.reg_model = None
+        self.open_space_session = None
         self.feature_columns = None
         self.models_loaded = False
+        # Reused feature row for _prepare_features
+        self._pf_buf = np.empty((1, 5), dtype=np.float32) if NUMPY_AVAILABLE else None
         
         self._load_models()
     
     def _load_models(self):
         """Load all ML models from disk."""
         try:
-            # Load PyTorch model
-            if TORCH_AVAILABLE and PYTORCH_MODEL_PATH.exists():
-                self.pytorch_model = torch.load(PYTORCH_MODEL_PATH, map_location=torch.device('cpu'))
-                self.pytorch_model.eval()
-                logger.info("PyTorch model loaded successfully")
-            else:
-                if not TORCH_AVAILABLE:
-                    logger.warning("PyTorch not available, skipping model loading")
-                else:
-                    logger.warning(f"PyTorch model not found at {PYTORCH_MODEL_PATH}")
-            
-            # Load classifier for open space requirement
-            if PICKLE_AVAILABLE and CLF_MODEL_PATH.exists():
-                with open(CLF_MODEL_PATH, 'rb') as f:
-                    self.clf_model = pickle.load(f)
-                logger.info("Open space classifier loaded successfully")
+            # Reuse the building predictor already loaded by ml_generation
+            if TORCH_AVAILABLE:
+                try:
+                    from app.services.ml_generation import load_shared_predictor
+                    self.pytorch_model, _ = load_shared_predictor()
+                    if self.pytorch_model is not None:
+                        logger.info("PyTorch model loaded successfully")
+                except Exception as e:
+                    logger.warning(f"PyTorch model could not be loaded: {e}")
             else:
-                if not PICKLE_AVAILABLE:
-                    logger.warning("Pickle not available")
-                else:
-                    logger.warning(f"Classifier model not found at {CLF_MODEL_PATH}")
+                logger.warning("PyTorch not available, skipping model loading")
             
-            # Load regressor for minimum open space area
-            if PICKLE_AVAILABLE and REG_MODEL_PATH.exists():
-                with open(REG_MODEL_PATH, 'rb') as f:
-                    self.reg_model = pickle.load(f)
-                logger.info("Open space regressor loaded successfully")
+            # Prefer the ONNX graph for the open space models when available
+            if ONNXRUNTIME_AVAILABLE and NUMPY_AVAILABLE and OPEN_SPACE_ONNX_PATH.exists():
+                self.open_space_session = ort.InferenceSession(
+                    str(OPEN_SPACE_ONNX_PATH), providers=["CPUExecutionProvider"]
+                )
+                logger.info("Open space ONNX models loaded successfully")
             else:
-                if not PICKLE_AVAILABLE:
-                    logger.warning("Pickle not available")
-                else:
-                    logger.warning(f"Regressor model not found at {REG_MODEL_PATH}")
+                self._load_pickled_open_space_models()
             
             # Load feature columns
             if FEATURE_COLUMNS_PATH.exists():
@@ -107,6 +136,30 @@ class MLService:
             logger.error(f"Error loading ML models: {e}")
             self.models_loaded = False
     
+    def _load_pickled_open_space_models(self):
+        """Load the sklearn open space classifier and regressor from pickle."""
+        # Load classifier for open space requirement
+        if PICKLE_AVAILABLE and CLF_MODEL_PATH.exists():
+            with open(CLF_MODEL_PATH, 'rb') as f:
+                self.clf_model = pickle.load(f)
+            logger.info("Open space classifier loaded successfully")
+        else:
+            if not PICKLE_AVAILABLE:
+                logger.warning("Pickle not available")
+            else:
+                logger.warning(f"Classifier model not found at {CLF_MODEL_PATH}")
+        
+        # Load regressor for minimum open space area
+        if PICKLE_AVAILABLE and REG_MODEL_PATH.exists():
+            with open(REG_MODEL_PATH, 'rb') as f:
+                self.reg_model = pickle.load(f)
+            logger.info("Open space regressor loaded successfully")
+        else:
+            if not PICKLE_AVAILABLE:
+                logger.warning("Pickle not available")
+            else:
+                logger.warning(f"Regressor model not found at {REG_MODEL_PATH}")
+    
     def predict_open_space_requirement(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Predict if open space is required and minimum area needed.
@@ -117,7 +170,8 @@ class MLService:
         Returns:
             Dict with prediction results
         """
-        if not self.models_loaded or not self.clf_model or not self.reg_model:
+        has_models = self.open_space_session is not None or (self.clf_model and self.reg_model)
+        if not self.models_loaded or not has_models:
             return {
                 "error": "ML models not loaded",
                 "requires_open_space": None,
@@ -128,13 +182,21 @@ class MLService:
             # Prepare features
             features = self._prepare_features(project_data)
             
-            # Predict if open space is required
-            requires_open_space = bool(self.clf_model.predict(features)[0])
-            
-            # Predict minimum open space area if required
-            min_open_space_m2 = 0.0
-            if requires_open_space:
-                min_open_space_m2 = float(self.reg_model.predict(features)[0])
+            if self.open_space_session is not None:
+                # Classifier and regressor in one native call
+                label, area = self.open_space_session.run(
+                    None, {"input": features}
+                )
+                requires_open_space = bool(label[0])
+                min_open_space_m2 = float(area[0][0]) if requires_open_space else 0.0
+            else:
+                # Predict if open space is required
+                requires_open_space = bool(self.clf_model.predict(features)[0])
+                
+                # Predict minimum open space area if required
+                min_open_space_m2 = 0.0
+                if requires_open_space:
+                    min_open_space_m2 = float(self.reg_model.predict(features)[0])
             
             return {
                 "requires_open_space": requires_open_space,
@@ -179,37 +241,20 @@ class MLService:
         Returns:
             Feature vector (numpy array if available, list otherwise)
         """
-        # Extract relevant features based on what models expect
-        features = {
-            'site_area': project_data.get('site_area', 0),
-            'project_type': project_data.get('project_type', 'RESIDENTIAL'),
-            'district': project_data.get('district', 'COLOMBO'),
-            'building_height': project_data.get('building_height', 0),
-            'floor_count': project_data.get('floor_count', 1),
-            'total_floor_area': project_data.get('total_floor_area', 0)
-        }
-        
-        # Convert categorical to numerical (simple encoding)
-        type_mapping = {
-            'RESIDENTIAL': 1,
-            'COMMERCIAL': 2,
-            'INDUSTRIAL': 3,
-            'MIXED_USE': 4,
-            'INSTITUTIONAL': 5
-        }
-        
-        feature_vector = [
-            features['site_area'],
-            type_mapping.get(features['project_type'], 1),
-            features['building_height'],
-            features['floor_count'],
-            features['total_floor_area']
-        ]
+        project_type = project_data.get('project_type', 'RESIDENTIAL')
+        feature_vector = (
+            project_data.get('site_area', 0),
+            _TYPE_MAP.get(project_type, 1),
+            project_data.get('building_height', 0),
+            project_data.get('floor_count', 1),
+            project_data.get('total_floor_area', 0)
+        )
         
-        if NUMPY_AVAILABLE:
-            import numpy as np
-            return np.array([feature_vector])
-        return [feature_vector]
+        if self._pf_buf is not None:
+            # Overwrite the preallocated row in place
+            self._pf_buf[0] = feature_vector
+            return self._pf_buf
+        return [list(feature_vector)]
     
     def _get_building_recommendations(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get building parameter recommendations based on UDA rules."""
@@ -232,34 +277,21 @@ class MLService:
         
         return recommendations
     
-    def _get_compliance_tips(self, project_data: Dict[str, Any]) -> List[str]:
+    def _get_compliance_tips(self, project_data: Dict[str, Any]) -> Tuple[str, ...]:
         """Get compliance tips based on project type and location."""
-        tips = [
-            "Ensure all setback requirements are met",
-            "Verify building coverage does not exceed maximum allowed",
-            "Check floor area ratio compliance",
-            "Provide adequate parking spaces as per UDA regulations",
-            "Ensure proper waste management facilities",
-            "Include fire safety measures and emergency exits"
-        ]
-        
-        project_type = project_data.get('project_type')
-        
-        if project_type == 'RESIDENTIAL':
-            tips.extend([
-                "Provide minimum 15% open space for landscaping",
-                "Ensure adequate natural ventilation in all units",
-                "Include recreational facilities for residents"
-            ])
-        elif project_type == 'COMMERCIAL':
-            tips.extend([
-                "Provide adequate loading/unloading areas",
-                "Ensure accessibility compliance for persons with disabilities",
-                "Include proper signage and wayfinding"
-            ])
-        
-        return tips
+        return _TIPS_BY_TYPE.get(project_data.get('project_type'), _BASE_TIPS)
+
+
+# Global ML service instance, created on first access of `ml_service`
+# so importing this module doesn't load any models
+_ml_service: Optional[MLService] = None
 
 
-# Global ML service instance
-ml_service = MLService()
+def __getattr__(name: str):
+    """Lazily create the MLService singleton (PEP 562 module attribute)."""
+    global _ml_service
+    if name == "ml_service":
+        if _ml_service is None:
+            _ml_service = MLService()
+        return _ml_service
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,34 +7,88 @@ This service integrates with ModelsLab's API to generate:
 - Additional 2D renders with various styles
 """
 
-import requests
+import httpx
+import asyncio
 import time
-import base64
+import hashlib
 import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, Any, Optional, List
 from app.config import settings
+from app.services.http_client import get_client
 
 logger = logging.getLogger(__name__)
 
+# Result polling: first retry after 1 s, growing 1.6x per attempt up to 15 s,
+# giving up after 5 minutes
+POLL_INITIAL_DELAY = 1.0
+POLL_BACKOFF = 1.6
+POLL_MAX_DELAY = 15.0
+POLL_JITTER = 0.5
+POLL_TIMEOUT = 300.0
+
+# Dedicated threads for the blocking Cloudinary SDK, so uploads don't
+# compete with other work for the loop's default executor
+_cloud_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cloudinary")
+
+# SHA-256 of floor plan bytes -> Cloudinary secure_url, so identical
+# floor plans are only uploaded once per process
+_upload_cache: Dict[str, str] = {}
+
 
 class ModelsLabService:
     """Service for ModelsLab API integration"""
     
-    def __init__(self):
+    def __init__(self, concurrency: int = 4):
         self.api_key = settings.MODELSLAB_API_KEY
         self.base_url = "https://modelslab.com/api/v6"
         self.max_poll_attempts = 60  # 2 minutes max wait time
+        self.concurrency = concurrency  # Max ModelsLab jobs in flight per tour
         
         if self.api_key:
             logger.info(f"ModelsLab service initialized with API key (length: {len(self.api_key)})")
         
-    def _encode_image_to_base64(self, image_path: str) -> str:
-        """Convert local image to base64 data URI"""
-        with open(image_path, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-            return f"data:image/jpeg;base64,{base64_image}"
+    async def _upload_floor_plan(self, floor_plan_path: str) -> str:
+        """Upload the floor plan to Cloudinary (once per unique content) and return its URL"""
+        loop = asyncio.get_running_loop()
+        with open(floor_plan_path, "rb") as image_file:
+            data = await loop.run_in_executor(None, image_file.read)
+        content_hash = hashlib.sha256(data).hexdigest()
+        
+        cached_url = _upload_cache.get(content_hash)
+        if cached_url:
+            logger.info(f"Reusing Cloudinary upload for identical floor plan: {cached_url}")
+            return cached_url
+        
+        import cloudinary
+        import cloudinary.uploader
+        
+        # Configure Cloudinary
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET
+        )
+        
+        # Upload image to Cloudinary; the SDK is blocking, so run it off the event loop
+        logger.info("Uploading floor plan to Cloudinary...")
+        upload_result = await loop.run_in_executor(_cloud_pool, partial(
+            cloudinary.uploader.upload,
+            data,
+            folder="floor_plans",
+            public_id=content_hash,
+            resource_type="image",
+            overwrite=True
+        ))
+        
+        image_url = upload_result['secure_url']
+        _upload_cache[content_hash] = image_url
+        logger.info(f"✅ Cloudinary upload successful: {image_url}")
+        return image_url
     
-    def generate_3d_floor_plan(
+    async def generate_3d_floor_plan(
         self, 
         floor_plan_path: str, 
         prompt: str = "modern interior design, photorealistic, professional architecture",
@@ -66,34 +120,10 @@ class ModelsLabService:
         
         try:
             start_time = time.time()
+            loop = asyncio.get_running_loop()
             
             # Upload floor plan to Cloudinary for public URL access
-            import cloudinary
-            import cloudinary.uploader
-            from app.config import settings
-            
-            # Configure Cloudinary
-            cloudinary.config(
-                cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-                api_key=settings.CLOUDINARY_API_KEY,
-                api_secret=settings.CLOUDINARY_API_SECRET
-            )
-            
-            # Upload image to Cloudinary
-            logger.info("Uploading floor plan to Cloudinary...")
-            from pathlib import Path
-            filename = Path(floor_plan_path).name
-            
-            upload_result = cloudinary.uploader.upload(
-                floor_plan_path,
-                folder="floor_plans",
-                public_id=Path(floor_plan_path).stem,
-                resource_type="image",
-                overwrite=True
-            )
-            
-            image_url = upload_result['secure_url']
-            logger.info(f"✅ Cloudinary upload successful: {image_url}")
+            image_url = await self._upload_floor_plan(floor_plan_path)
             
             # Generate 3D GLB model using Blender
             logger.info("Generating 3D GLB model with Blender...")
@@ -112,7 +142,9 @@ class ModelsLabService:
                 }
                 
                 # Generate 3D model with Blender
-                blender_result = blender_service.generate_house_from_params(**house_params)
+                blender_result = await loop.run_in_executor(
+                    None, partial(blender_service.generate_house_from_params, **house_params)
+                )
                 
                 if blender_result.get("success"):
                     logger.info(f"✅ 3D GLB generation complete!")
@@ -148,6 +180,10 @@ class ModelsLabService:
                     "note": "Continuing with 2D renders"
                 }
             
+            # NOTE: not reached at the moment -- every branch of the Blender
+            # generation above returns. The ModelsLab request and result
+            # polling below are kept for when the API path is re-enabled.
+            
             # Prepare API request
             headers = {
                 "Content-Type": "application/json"
@@ -167,7 +203,7 @@ class ModelsLabService:
             
             # Submit generation request
             logger.info("Submitting 3D floor plan generation to ModelsLab...")
-            response = requests.post(
+            response = await get_client().post(
                 f"{self.base_url}/interior/floor_planning",
                 headers=headers,
                 json=payload,
@@ -191,12 +227,16 @@ class ModelsLabService:
                 
                 if fetch_url:
                     logger.info(f"Generation queued. Polling {fetch_url} after {eta}s...")
-                    time.sleep(eta + 5)  # Wait ETA + 5s buffer
+                    await asyncio.sleep(eta)  # Nothing to fetch before the ETA
                     
-                    # Poll the fetch endpoint
+                    # Poll the fetch endpoint, backing off while the job is still queued
+                    delay = POLL_INITIAL_DELAY
+                    deadline = loop.time() + POLL_TIMEOUT
                     for attempt in range(self.max_poll_attempts):
+                        if loop.time() > deadline:
+                            break
                         try:
-                            fetch_response = requests.post(
+                            fetch_response = await get_client().post(
                                 fetch_url,
                                 headers=headers,
                                 json={"key": self.api_key},
@@ -218,12 +258,12 @@ class ModelsLabService:
                                         "reason": fetch_result.get("message", "Unknown error")
                                     }
                             
-                            # Wait before retry
-                            time.sleep(5)
-                            
                         except Exception as e:
                             logger.warning(f"Fetch attempt {attempt + 1} failed: {e}")
-                            time.sleep(5)
+                        
+                        # Wait before retry (exponential backoff with jitter)
+                        await asyncio.sleep(delay + random.random() * POLL_JITTER)
+                        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
             
             # Check if generation was successful
             if result.get("status") == "error":
@@ -248,7 +288,7 @@ class ModelsLabService:
                 "meta": result.get("meta", {})
             }
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error("ModelsLab API request timed out")
             return {
                 "success": False,
@@ -261,7 +301,7 @@ class ModelsLabService:
                 "reason": str(e)
             }
     
-    def generate_360_tour(
+    async def generate_360_tour(
         self, 
         floor_plan_path: str, 
         rooms: List[Dict[str, str]]
@@ -291,28 +331,38 @@ class ModelsLabService:
             }
         
         try:
-            panoramas = []
+            # Rate limiting: at most `concurrency` generations run at once
+            semaphore = asyncio.Semaphore(self.concurrency)
             
-            for room in rooms[:5]:  # Limit to 5 rooms to control costs
+            async def generate_room(room: Dict[str, str]) -> Dict[str, Any]:
                 room_type = room.get("type", "Room")
                 
                 # Generate 360° panorama for this room
                 prompt = f"360 degree panoramic view of a {room_type}, photorealistic, modern interior, wide angle"
                 
-                result = self.generate_3d_floor_plan(
-                    floor_plan_path,
-                    prompt=prompt,
-                    include_360=True
-                )
-                
+                async with semaphore:
+                    return await self.generate_3d_floor_plan(
+                        floor_plan_path,
+                        prompt=prompt,
+                        include_360=True
+                    )
+            
+            selected_rooms = rooms[:5]  # Limit to 5 rooms to control costs
+            results = await asyncio.gather(
+                *(generate_room(room) for room in selected_rooms),
+                return_exceptions=True
+            )
+            
+            panoramas = []
+            for room, result in zip(selected_rooms, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Panorama for {room.get('type', 'Room')} failed: {result}")
+                    continue
                 if result.get("success") and result.get("tour_360_url"):
                     panoramas.append({
-                        "room_type": room_type,
+                        "room_type": room.get("type", "Room"),
                         "panorama_url": result["tour_360_url"]
                     })
-                
-                # Rate limiting: wait 2 seconds between requests
-                time.sleep(2)
             
             return {
                 "success": True,
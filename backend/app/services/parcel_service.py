@@ -2,7 +2,8 @@
 Parcel Subdivision Service - Divide city blocks into lots/parcels.
 """
 from shapely.geometry import Polygon, LineString, Point, MultiPolygon
-from shapely.ops import split, unary_union
+from shapely.ops import polygonize, unary_union
+import shapely
 import shapely.affinity
 from typing import List, Dict, Tuple
 import logging
@@ -19,6 +20,8 @@ class ParcelSubdivisionService:
         self.min_parcel_area = 50  # square meters
         self.min_parcel_width = 5  # meters
         self.building_setback = 2  # meters from parcel edge
+        # Parcel edges are straight, so a coarse mitred buffer is enough
+        self.setback_buffer_kwargs = {'quad_segs': 4, 'join_style': 'mitre'}
     
     def subdivide_block(
         self,
@@ -54,20 +57,16 @@ class ParcelSubdivisionService:
             
             # Split block by division lines
             if division_lines:
-                result = block
-                for line in division_lines:
-                    # Extend line to ensure it crosses the polygon
-                    extended_line = self._extend_line(line, block.bounds)
-                    parts = split(result, extended_line)
-                    
-                    if len(parts.geoms) > 0:
-                        result = parts
+                # Extend lines to ensure they cross the polygon, then node them
+                # with the block boundary and polygonize in a single pass
+                cutter = unary_union([self._extend_line(line, block.bounds) for line in division_lines])
+                faces = polygonize(unary_union([block.boundary, cutter]))
                 
-                # Extract individual parcels
-                if hasattr(result, 'geoms'):
-                    parcel_polygons = list(result.geoms)
-                else:
-                    parcel_polygons = [result]
+                # Keep faces inside the block (drops holes); a point test is robust
+                # to the noding noise that makes covered_by reject edge faces
+                parcel_polygons = [face for face in faces if block.contains(face.representative_point())]
+                if not parcel_polygons:
+                    parcel_polygons = [block]
             else:
                 # If division failed, use whole block
                 parcel_polygons = [block]
@@ -88,17 +87,15 @@ class ParcelSubdivisionService:
     
     def _get_longest_edge(self, polygon: Polygon) -> LineString:
         """Get the longest edge of a polygon."""
-        coords = list(polygon.exterior.coords)
-        max_length = 0
-        longest_edge = None
+        coords = np.asarray(polygon.exterior.coords)[:, :2]
+        if len(coords) < 2:
+            return None
         
-        for i in range(len(coords) - 1):
-            edge = LineString([coords[i], coords[i + 1]])
-            if edge.length > max_length:
-                max_length = edge.length
-                longest_edge = edge
+        # Edge lengths in one pass; only the winning edge becomes a LineString
+        deltas = np.diff(coords, axis=0)
+        i = int(np.argmax(np.sqrt(deltas[:, 0] ** 2 + deltas[:, 1] ** 2)))
         
-        return longest_edge
+        return LineString([coords[i], coords[i + 1]])
     
     def _create_division_lines(
         self,
@@ -107,8 +104,6 @@ class ParcelSubdivisionService:
         target_width: float
     ) -> List[LineString]:
         """Create perpendicular division lines along street frontage."""
-        lines = []
-        
         # Get frontage direction
         start, end = street_frontage.coords[0], street_frontage.coords[-1]
         dx = end[0] - start[0]
@@ -116,7 +111,7 @@ class ParcelSubdivisionService:
         length = np.sqrt(dx**2 + dy**2)
         
         if length == 0:
-            return lines
+            return []
         
         # Normalize direction
         dx /= length
@@ -126,25 +121,23 @@ class ParcelSubdivisionService:
         perp_dx = -dy
         perp_dy = dx
         
-        # Create division points along frontage
+        # Division points along frontage, all at once
         num_divisions = int(length / target_width)
+        ts = np.arange(1, num_divisions) / num_divisions
+        pxs = start[0] + ts * dx * length
+        pys = start[1] + ts * dy * length
         
-        for i in range(1, num_divisions):
-            # Point on frontage
-            t = i / num_divisions
-            px = start[0] + t * dx * length
-            py = start[1] + t * dy * length
-            
-            # Create perpendicular line
-            line_length = max(block.bounds[2] - block.bounds[0],
-                            block.bounds[3] - block.bounds[1]) * 2
-            
-            p1 = (px - perp_dx * line_length, py - perp_dy * line_length)
-            p2 = (px + perp_dx * line_length, py + perp_dy * line_length)
-            
-            lines.append(LineString([p1, p2]))
+        # Perpendicular lines long enough to cross the block
+        line_length = max(block.bounds[2] - block.bounds[0],
+                        block.bounds[3] - block.bounds[1]) * 2
+        
+        p1x, p1y = pxs - perp_dx * line_length, pys - perp_dy * line_length
+        p2x, p2y = pxs + perp_dx * line_length, pys + perp_dy * line_length
         
-        return lines
+        return [
+            LineString([(x1, y1), (x2, y2)])
+            for x1, y1, x2, y2 in zip(p1x.tolist(), p1y.tolist(), p2x.tolist(), p2y.tolist())
+        ]
     
     def _extend_line(self, line: LineString, bounds: Tuple) -> LineString:
         """Extend a line to ensure it crosses bounding box."""
@@ -175,37 +168,41 @@ class ParcelSubdivisionService:
         """Assign intended uses to parcels."""
         parcels = []
         
-        # Filter out very small parcels
-        valid_parcels = [p for p in parcel_polygons if p.area > self.min_parcel_area]
+        # Filter out very small parcels (areas computed in one vectorized call)
+        polygons = np.array(parcel_polygons, dtype=object)
+        areas = shapely.area(polygons)
+        valid = areas > self.min_parcel_area
         
-        if not valid_parcels:
-            valid_parcels = parcel_polygons
+        if valid.any():
+            polygons, areas = polygons[valid], areas[valid]
         
-        total_area = sum(p.area for p in valid_parcels)
+        total_area = float(areas.sum())
         
-        # Target ratios
-        building_ratio = 0.7
-        green_ratio = 0.2
-        parking_ratio = 0.1
+        # Target areas per use (70% building, 20% green, 10% parking)
+        building_target = total_area * 0.7
+        green_target = total_area * 0.2
+        parking_target = total_area * 0.1
         
-        # Sort by area (largest first)
-        sorted_parcels = sorted(valid_parcels, key=lambda p: p.area, reverse=True)
+        # Sort by area (largest first; stable, so ties keep input order)
+        order = np.argsort(-areas, kind='stable').tolist()
+        area_values = areas.tolist()
         
         building_area = 0
         green_area = 0
         parking_area = 0
         
-        for parcel in sorted_parcels:
-            area = parcel.area
+        for i in order:
+            parcel = polygons[i]
+            area = area_values[i]
             
             # Decide use based on current ratios
-            if building_area < total_area * building_ratio:
+            if building_area < building_target:
                 use_type = 'building'
                 building_area += area
-            elif green_area < total_area * green_ratio:
+            elif green_area < green_target:
                 use_type = 'green'
                 green_area += area
-            elif parking_area < total_area * parking_ratio:
+            elif parking_area < parking_target:
                 use_type = 'parking'
                 parking_area += area
             else:
@@ -215,15 +212,38 @@ class ParcelSubdivisionService:
                 'geometry': parcel,
                 'type': use_type,
                 'area': area,
-                'building_footprint': parcel.buffer(-self.building_setback) if use_type == 'building' else None
+                'building_footprint': None
             })
         
+        # Setback footprints for all building parcels in one vectorized buffer
+        building_parcels = [parcel for parcel in parcels if parcel['type'] == 'building']
+        if building_parcels:
+            footprints = self._apply_setback(
+                np.array([parcel['geometry'] for parcel in building_parcels], dtype=object)
+            )
+            for parcel, footprint in zip(building_parcels, footprints):
+                parcel['building_footprint'] = footprint
+        
         return parcels
     
-    def create_building_footprint(self, parcel: Polygon, coverage_ratio: float = 0.6) -> Polygon:
-        """Create a building footprint within a parcel."""
+    def _apply_setback(self, parcels):
+        """Shrink a parcel (or an array of parcels) by the building setback."""
+        return shapely.buffer(parcels, -self.building_setback, **self.setback_buffer_kwargs)
+    
+    def create_building_footprint(
+        self,
+        parcel: Polygon,
+        coverage_ratio: float = 0.6,
+        setback_footprint: Polygon = None
+    ) -> Polygon:
+        """
+        Create a building footprint within a parcel.
+        
+        Pass the parcel's precomputed 'building_footprint' as setback_footprint
+        to skip buffering the parcel again.
+        """
         # Apply setback
-        footprint = parcel.buffer(-self.building_setback)
+        footprint = setback_footprint if setback_footprint is not None else self._apply_setback(parcel)
         
         # If coverage ratio < 1, further reduce
         if coverage_ratio < 1.0:
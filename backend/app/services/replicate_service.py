@@ -5,20 +5,74 @@ This service provides AI enhancement for Blender-generated city renders using
 Stable Diffusion and ControlNet models via the Replicate API.
 """
 import os
+import asyncio
+import hashlib
 import logging
+import shutil
 import replicate
+from replicate.prediction import Prediction
 from typing import Optional, List, Dict, Any
 from pathlib import Path
-import requests
+import aiofiles
 from PIL import Image
 import io
 from dotenv import load_dotenv
 
+from app.services.http_client import get_client
+
 # Load environment variables from .env file
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+SDXL_VERSION = "39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b"
+DEFAULT_STRENGTH = 0.7
+DEFAULT_GUIDANCE_SCALE = 7.5
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Concurrent downloads in generate_multiple_views
+SAVE_WORKERS = 2
+
+# SDXL works at <= 1024 px, so larger renders are shrunk before upload
+MAX_UPLOAD_SIZE = (1024, 1024)
+UPLOAD_JPEG_QUALITY = 92
+
+
+def _downscale_for_upload(image_path: str) -> io.BytesIO:
+    """Fit the render within MAX_UPLOAD_SIZE and re-encode it as JPEG in memory"""
+    with Image.open(image_path) as img:
+        img.thumbnail(MAX_UPLOAD_SIZE, Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.convert('RGB').save(buffer, 'JPEG', quality=UPLOAD_JPEG_QUALITY)
+    buffer.seek(0)
+    buffer.name = "render.jpg"  # Lets Replicate infer the image/jpeg MIME type
+    return buffer
+
+# Enhanced images keyed by input content + prompt/params, reused across calls
+ENHANCEMENT_CACHE_DIR = Path(os.getenv('STORAGE_BASE_PATH', './storage')) / "cache" / "replicate_enhanced"
+
+
+def _enhancement_cache_key(image_path: str, *params: Any) -> str:
+    """SHA-256 over the image bytes and the generation parameters"""
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    for param in params:
+        digest.update(b"\0" + str(param).encode())
+    return digest.hexdigest()
+
+
+async def _download_to_file(url: str, output_path: str) -> int:
+    """Stream url to output_path in chunks; the file is only written on HTTP 200"""
+    async with get_client().stream("GET", url, timeout=60.0) as response:
+        if response.status_code == 200:
+            async with aiofiles.open(output_path, 'wb') as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+        return response.status_code
+
 
 class ReplicateService:
     """Service for AI-powered image enhancement using Replicate API."""
@@ -37,8 +91,8 @@ class ReplicateService:
         input_image_path: str,
         prompt: str = "photorealistic city aerial view, detailed buildings, realistic lighting, 8k, professional architecture photography",
         style: str = "photorealistic",
-        strength: float = 0.7,
-        guidance_scale: float = 7.5
+        strength: float = DEFAULT_STRENGTH,
+        guidance_scale: float = DEFAULT_GUIDANCE_SCALE
     ) -> Optional[str]:
         """
         Enhance a Blender-generated city render using Stable Diffusion XL.
@@ -58,50 +112,78 @@ class ReplicateService:
             return None
         
         try:
-            logger.info(f"Enhancing city render: {input_image_path}")
+            output_path = input_image_path.replace('.png', '_enhanced.png')
             
-            # Use Stable Diffusion XL for image-to-image
-            # Model: stability-ai/sdxl
-            # Open file as file object (Replicate expects file object, not bytes)
-            with open(input_image_path, 'rb') as image_file:
-                output = replicate.run(
-                    "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b",
-                    input={
-                        "image": image_file,
-                        "prompt": prompt,
-                        "negative_prompt": "blurry, low quality, distorted, unrealistic, cartoon, 3d render artifacts",
-                        "num_inference_steps": 30,
-                        "guidance_scale": guidance_scale,
-                        "strength": strength,
-                        "scheduler": "DPMSolverMultistep"
-                    }
-                )
+            # Identical render + settings: reuse the earlier result instead of paying for a new one
+            cache_path = ENHANCEMENT_CACHE_DIR / f"{_enhancement_cache_key(input_image_path, prompt, strength, guidance_scale)}.png"
+            if cache_path.exists():
+                shutil.copyfile(cache_path, output_path)
+                logger.info(f"Reused cached enhancement for {input_image_path}: {output_path}")
+                return output_path
             
-            # Download enhanced image
-            if output and len(output) > 0:
-                enhanced_url = output[0]
-                
-                # Download the image
-                response = requests.get(enhanced_url)
-                if response.status_code == 200:
-                    # Save enhanced image
-                    output_path = input_image_path.replace('.png', '_enhanced.png')
-                    with open(output_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    logger.info(f"Enhanced image saved to: {output_path}")
-                    return output_path
-                else:
-                    logger.error(f"Failed to download enhanced image: {response.status_code}")
-                    return None
-            else:
-                logger.error("No output from Replicate API")
+            logger.info(f"Enhancing city render: {input_image_path}")
+            
+            prediction = await self._submit_enhancement(input_image_path, prompt, strength, guidance_scale)
+            enhanced_url = await self._await_enhancement(prediction)
+            if enhanced_url is None:
                 return None
+            
+            return await self._save_enhancement(enhanced_url, output_path, cache_path)
                 
         except Exception as e:
             logger.error(f"Error enhancing city render: {e}")
             return None
     
+    async def _submit_enhancement(
+        self,
+        input_image_path: str,
+        prompt: str,
+        strength: float,
+        guidance_scale: float
+    ) -> Prediction:
+        """Create the SDXL image-to-image prediction without waiting for it."""
+        # Replicate expects a file object, not bytes; send a downscaled JPEG
+        loop = asyncio.get_running_loop()
+        with await loop.run_in_executor(None, _downscale_for_upload, input_image_path) as image_file:
+            return await replicate.predictions.async_create(
+                version=SDXL_VERSION,
+                input={
+                    "image": image_file,
+                    "prompt": prompt,
+                    "negative_prompt": "blurry, low quality, distorted, unrealistic, cartoon, 3d render artifacts",
+                    "num_inference_steps": 30,
+                    "guidance_scale": guidance_scale,
+                    "strength": strength,
+                    "scheduler": "DPMSolverMultistep"
+                }
+            )
+    
+    async def _await_enhancement(self, prediction: Prediction) -> Optional[str]:
+        """Wait for a prediction to finish and return its first output URL."""
+        await prediction.async_wait()
+        if prediction.status == "failed":
+            # ModelError's constructor differs across replicate versions
+            raise RuntimeError(f"Replicate prediction {prediction.id} failed: {prediction.error}")
+        
+        output = prediction.output
+        if output and len(output) > 0:
+            return str(output[0])
+        
+        logger.error("No output from Replicate API")
+        return None
+    
+    async def _save_enhancement(self, enhanced_url: str, output_path: str, cache_path: Path) -> Optional[str]:
+        """Download the enhanced image straight to disk and add it to the cache."""
+        status_code = await _download_to_file(enhanced_url, output_path)
+        if status_code == 200:
+            ENHANCEMENT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(output_path, cache_path)
+            logger.info(f"Enhanced image saved to: {output_path}")
+            return output_path
+        
+        logger.error(f"Failed to download enhanced image: {status_code}")
+        return None
+    
     async def enhance_with_controlnet(
         self,
         input_image_path: str,
@@ -131,7 +213,7 @@ class ReplicateService:
                 input_image = f.read()
             
             # Use ControlNet model for structure-preserving enhancement
-            output = replicate.run(
+            output = await replicate.async_run(
                 "jagilley/controlnet-canny:aff48af9c68d162388d230a2ab003f68d2638d88307bdaf1c2f1ac95079c9613",
                 input={
                     "image": input_image,
@@ -147,13 +229,9 @@ class ReplicateService:
             
             if output and len(output) > 0:
                 enhanced_url = output[0]
-                response = requests.get(enhanced_url)
+                output_path = input_image_path.replace('.png', '_controlnet.png')
                 
-                if response.status_code == 200:
-                    output_path = input_image_path.replace('.png', '_controlnet.png')
-                    with open(output_path, 'wb') as f:
-                        f.write(response.content)
-                    
+                if await _download_to_file(str(enhanced_url), output_path) == 200:
                     logger.info(f"ControlNet enhanced image saved to: {output_path}")
                     return output_path
                     
@@ -180,23 +258,83 @@ class ReplicateService:
         Returns:
             List of dicts with 'original' and 'enhanced' paths
         """
-        results = []
+        if not self.api_token:
+            logger.warning("Replicate API not configured. Skipping enhancement.")
+            return [
+                {'original': path, 'enhanced': None, 'view_name': f"view_{i+1}"}
+                for i, path in enumerate(base_render_paths)
+            ]
+        
+        # Three stages linked by queues, so one view's download overlaps the
+        # next view's prediction: submit -> wait for prediction -> save.
+        # batch_size sizes the submit/wait stages (Replicate calls in flight).
+        workers = max(1, batch_size)
+        enhanced: List[Optional[str]] = [None] * len(base_render_paths)
+        submit_q: asyncio.Queue = asyncio.Queue()
+        poll_q: asyncio.Queue = asyncio.Queue()
+        save_q: asyncio.Queue = asyncio.Queue()
         
         for i, render_path in enumerate(base_render_paths):
-            logger.info(f"Processing view {i+1}/{len(base_render_paths)}")
-            
-            enhanced_path = await self.enhance_city_render(
-                input_image_path=render_path,
-                prompt=prompt
-            )
-            
-            results.append({
-                'original': render_path,
-                'enhanced': enhanced_path,
-                'view_name': f"view_{i+1}"
-            })
+            submit_q.put_nowait((i, render_path))
+        
+        async def submitter():
+            while True:
+                i, render_path = await submit_q.get()
+                try:
+                    output_path = render_path.replace('.png', '_enhanced.png')
+                    cache_path = ENHANCEMENT_CACHE_DIR / f"{_enhancement_cache_key(render_path, prompt, DEFAULT_STRENGTH, DEFAULT_GUIDANCE_SCALE)}.png"
+                    if cache_path.exists():
+                        shutil.copyfile(cache_path, output_path)
+                        enhanced[i] = output_path
+                    else:
+                        logger.info(f"Processing view {i+1}/{len(base_render_paths)}")
+                        prediction = await self._submit_enhancement(
+                            render_path, prompt, DEFAULT_STRENGTH, DEFAULT_GUIDANCE_SCALE
+                        )
+                        await poll_q.put((i, prediction, output_path, cache_path))
+                except Exception as e:
+                    logger.error(f"Error enhancing view {i+1}: {e}")
+                finally:
+                    submit_q.task_done()
+        
+        async def poller():
+            while True:
+                i, prediction, output_path, cache_path = await poll_q.get()
+                try:
+                    enhanced_url = await self._await_enhancement(prediction)
+                    if enhanced_url is not None:
+                        await save_q.put((i, enhanced_url, output_path, cache_path))
+                except Exception as e:
+                    logger.error(f"Error enhancing view {i+1}: {e}")
+                finally:
+                    poll_q.task_done()
+        
+        async def saver():
+            while True:
+                i, enhanced_url, output_path, cache_path = await save_q.get()
+                try:
+                    enhanced[i] = await self._save_enhancement(enhanced_url, output_path, cache_path)
+                except Exception as e:
+                    logger.error(f"Error saving view {i+1}: {e}")
+                finally:
+                    save_q.task_done()
+        
+        tasks = [asyncio.create_task(submitter()) for _ in range(workers)]
+        tasks += [asyncio.create_task(poller()) for _ in range(workers)]
+        tasks += [asyncio.create_task(saver()) for _ in range(SAVE_WORKERS)]
+        try:
+            # Stages drain in order, so each queue is complete once its predecessor is
+            await submit_q.join()
+            await poll_q.join()
+            await save_q.join()
+        finally:
+            for task in tasks:
+                task.cancel()
         
-        return results
+        return [
+            {'original': render_path, 'enhanced': enhanced_path, 'view_name': f"view_{i+1}"}
+            for i, (render_path, enhanced_path) in enumerate(zip(base_render_paths, enhanced))
+        ]
     
     def estimate_cost(
         self,
@@ -1,18 +1,113 @@
 """
 Video generation service for room tour animations.
-Uses MoviePy to stitch room images into MP4 video.
+Uses ffmpeg to stitch room images into MP4 video.
 """
 
+import asyncio
 import logging
+import os
+import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Tuple
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 import tempfile
+import cv2
+import numpy as np
+
+from app.services.http_client import get_client
+
+try:
+    from cykooz.resizer import Resizer, ResizeOptions, ResizeAlg, FilterType
+    CYKOOZ_AVAILABLE = True
+except ImportError:
+    CYKOOZ_AVAILABLE = False
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _JPEG = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, RuntimeError):
+    # RuntimeError: PyTurboJPEG installed but libturbojpeg not found
+    _JPEG = None
+    TURBOJPEG_AVAILABLE = False
+
+try:
+    import PyNvVideoCodec as nvc
+    PYNVVIDEOCODEC_AVAILABLE = True
+except ImportError:
+    PYNVVIDEOCODEC_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Encoder settings: NVENC on NVIDIA GPUs, fast software x264 otherwise
+NVENC_PARAMS = ['-preset', 'p4', '-tune', 'hq', '-rc', 'vbr', '-b:v', '8M', '-pix_fmt', 'yuv420p']
+NVC_ENCODER_PARAMS = {'codec': 'h264', 'preset': 'P4', 'tuning_info': 'high_quality'}
+X264_PARAMS = ['-preset', 'ultrafast', '-tune', 'zerolatency', '-pix_fmt', 'yuv420p']
+
+# Room captions; TOUR_FONT (path or name) overrides the font lookup
+CAPTION_FONT_SIZE = 50
+CAPTION_FONTS = ("Arial.ttf", "DejaVuSans-Bold.ttf")
+
+# Software encodes run one ffmpeg per room, this many at a time
+X264_CLIP_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+def _ffmpeg_binary() -> str:
+    """ffmpeg executable bundled with imageio-ffmpeg (falls back to the one on PATH)"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+def _rgb_to_nv12(rgb: np.ndarray) -> np.ndarray:
+    """Convert an RGB frame to NV12 (Y plane, then interleaved UV) for NVENC."""
+    height, width = rgb.shape[:2]
+    i420 = cv2.cvtColor(rgb, cv2.COLOR_RGB2YUV_I420)
+    u = i420[height:height + height // 4].reshape(-1)
+    v = i420[height + height // 4:].reshape(-1)
+    uv = np.empty(u.size * 2, dtype=np.uint8)
+    uv[0::2] = u
+    uv[1::2] = v
+    return np.concatenate([i420[:height].reshape(-1), uv]).reshape(height * 3 // 2, width)
+
+
+def _concat_quote(path: Path) -> str:
+    """Quote a path for an ffmpeg concat list"""
+    return "'" + str(path.resolve()).replace("'", "'\\''") + "'"
+
+
+@lru_cache(maxsize=1)
+def _caption_font() -> ImageFont.FreeTypeFont:
+    """Load the caption font once per process (services are created per request)"""
+    for name in (os.getenv('TOUR_FONT'), *CAPTION_FONTS):
+        if not name:
+            continue
+        try:
+            return ImageFont.truetype(name, CAPTION_FONT_SIZE)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=CAPTION_FONT_SIZE)
+
+
+@lru_cache(maxsize=1)
+def _nvenc_available() -> bool:
+    """Check once per process whether ffmpeg was built with h264_nvenc"""
+    try:
+        result = subprocess.run(
+            [_ffmpeg_binary(), '-hide_banner', '-encoders'],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        return 'h264_nvenc' in result.stdout
+    except Exception:
+        return False
+
+
 class RoomTourVideoService:
     """Service for generating MP4 videos from room tour images."""
     
@@ -22,6 +117,14 @@ class RoomTourVideoService:
         self.fps = 24
         self.duration_per_room = 5  # seconds
         self.resolution = (1280, 720)  # HD
+        self.codec = 'h264_nvenc' if _nvenc_available() else 'libx264'
+        # SIMD Lanczos3 resizer (fast_image_resize); OpenCV INTER_AREA otherwise
+        if CYKOOZ_AVAILABLE:
+            self._resizer = Resizer()
+            self._resize_options = ResizeOptions(resize_alg=ResizeAlg.convolution(FilterType.lanczos3))
+        else:
+            self._resizer = None
+        self._font = _caption_font()
     
     async def generate_video(
         self, 
@@ -38,64 +141,41 @@ class RoomTourVideoService:
         Returns:
             Path to generated video file
         """
-        try:
-            from moviepy.editor import ImageClip, concatenate_videoclips, TextClip, CompositeVideoClip
-        except ImportError:
-            logger.error("MoviePy not installed. Install with: pip install moviepy")
-            raise ImportError("MoviePy is required for video generation")
-        
         output_path = self.temp_dir / output_filename
         
         try:
             # Download and prepare images
             logger.info(f"Downloading {len(rooms)} room images...")
-            local_images = await self._download_images(rooms)
+            downloaded = await self._download_images(rooms)
+            if not downloaded:
+                raise ValueError("No room images could be downloaded")
             
-            # Create video clips
-            clips = []
-            for idx, (room, img_path) in enumerate(zip(rooms, local_images)):
-                logger.info(f"Creating clip {idx + 1}/{len(rooms)}: {room.get('room_type')}")
-                
-                # Create image clip
-                img_clip = ImageClip(str(img_path), duration=self.duration_per_room)
-                
-                # Add text overlay
-                room_text = f"{room.get('room_type', 'Room')}"
-                if room.get('dimensions'):
-                    room_text += f"\n{room['dimensions']}"
-                
+            # Feed the GPU encoder directly when PyNvVideoCodec is installed
+            if PYNVVIDEOCODEC_AVAILABLE:
                 try:
-                    text_clip = TextClip(
-                        room_text,
-                        fontsize=50,
-                        color='white',
-                        font='Arial-Bold',
-                        stroke_color='black',
-                        stroke_width=2
-                    )
-                    text_clip = text_clip.set_position(('center', 50)).set_duration(self.duration_per_room)
-                    
-                    # Composite
-                    video_clip = CompositeVideoClip([img_clip, text_clip])
+                    logger.info(f"Writing video to {output_path} (PyNvVideoCodec)...")
+                    await self._encode_video_nvc(downloaded, output_path)
+                    logger.info(f"Video generated successfully: {output_path}")
+                    return output_path
                 except Exception as e:
-                    logger.warning(f"Failed to add text overlay: {e}, using image only")
-                    video_clip = img_clip
-                
-                clips.append(video_clip)
-            
-            # Concatenate all clips
-            logger.info("Concatenating clips...")
-            final_video = concatenate_videoclips(clips, method="compose")
+                    logger.warning(f"PyNvVideoCodec encoding failed: {e}, falling back to ffmpeg")
             
-            # Write video file
-            logger.info(f"Writing video to {output_path}...")
-            final_video.write_videofile(
-                str(output_path),
-                fps=self.fps,
-                codec='libx264',
-                audio=False,
-                logger=None  # Suppress MoviePy's verbose logging
-            )
+            # NVENC: one ffmpeg process fed the captioned frames raw over stdin.
+            # x264: per-room clips encoded in parallel, then stream-copy joined.
+            # Fall back to x264 when NVENC is listed but has no usable GPU.
+            codecs = [self.codec] if self.codec == 'libx264' else [self.codec, 'libx264']
+            for attempt, codec in enumerate(codecs):
+                logger.info(f"Writing video to {output_path} ({codec})...")
+                try:
+                    if codec == 'libx264' and len(downloaded) > 1:
+                        await self._encode_video_parallel(downloaded, output_path)
+                    else:
+                        await self._encode_video(downloaded, output_path, codec)
+                    break
+                except RuntimeError as e:
+                    if attempt == len(codecs) - 1:
+                        raise
+                    logger.warning(f"Video encoding with {codec} failed: {e}, retrying")
             
             logger.info(f"Video generated successfully: {output_path}")
             return output_path
@@ -104,53 +184,197 @@ class RoomTourVideoService:
             logger.error(f"Error generating video: {e}", exc_info=True)
             raise
     
-    async def _download_images(self, rooms: List[Dict]) -> List[Path]:
+    async def _encode_video(self, downloaded: List[Tuple[Dict[str, Any], np.ndarray]], output_path: Path, codec: str):
+        """
+        Pipe one rawvideo frame per room into a single ffmpeg process.
+        
+        The input rate is one frame per duration_per_room seconds and the fps
+        filter repeats each still, so only N frames cross the pipe.
+        """
+        width, height = self.resolution
+        cmd = [
+            _ffmpeg_binary(), '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}',
+            '-framerate', f'1/{self.duration_per_room}', '-i', '-',
+            '-vf', f'fps={self.fps},format=yuv420p',
+            '-c:v', codec, *(NVENC_PARAMS if codec == 'h264_nvenc' else X264_PARAMS),
+            '-an', str(output_path)
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        # Read stderr concurrently so a chatty ffmpeg can't block on a full pipe
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            for _, frame in downloaded:
+                process.stdin.write(frame.tobytes())
+                await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited early; its stderr explains why
+        
+        stderr = await stderr_task
+        if await process.wait() != 0:
+            raise RuntimeError(stderr.decode(errors='replace').strip()[-500:])
+    
+    async def _encode_video_parallel(self, downloaded: List[Tuple[Dict[str, Any], np.ndarray]], output_path: Path):
+        """
+        Encode each room as its own x264 clip across X264_CLIP_WORKERS ffmpeg
+        processes, then join the clips with the concat demuxer (-c copy).
+        """
+        clip_paths = [self.temp_dir / f"{output_path.stem}_clip_{idx}.mp4" for idx in range(len(downloaded))]
+        list_path = self.temp_dir / f"{output_path.stem}_clips.txt"
+        semaphore = asyncio.Semaphore(X264_CLIP_WORKERS)
+        
+        async def encode_clip(item, clip_path):
+            async with semaphore:
+                await self._encode_video([item], clip_path, 'libx264')
+        
+        try:
+            await asyncio.gather(*(encode_clip(item, clip_path) for item, clip_path in zip(downloaded, clip_paths)))
+            
+            list_path.write_text("".join(f"file {_concat_quote(clip_path)}\n" for clip_path in clip_paths), encoding='utf-8')
+            process = await asyncio.create_subprocess_exec(
+                _ffmpeg_binary(), '-y', '-hide_banner', '-loglevel', 'error',
+                '-f', 'concat', '-safe', '0', '-i', str(list_path),
+                '-c', 'copy', '-movflags', '+faststart', str(output_path),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(stderr.decode(errors='replace').strip()[-500:])
+        finally:
+            for path in (*clip_paths, list_path):
+                path.unlink(missing_ok=True)
+    
+    async def _encode_video_nvc(self, downloaded: List[Tuple[Dict[str, Any], np.ndarray]], output_path: Path):
+        """
+        Encode the stills on NVENC through PyNvVideoCodec, then mux the
+        Annex-B stream into MP4 with ffmpeg (stream copy, no re-encode).
+        """
+        bitstream_path = self.temp_dir / f"{output_path.stem}.h264"
+        await asyncio.to_thread(self._write_nvc_bitstream, downloaded, bitstream_path)
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                _ffmpeg_binary(), '-y', '-hide_banner', '-loglevel', 'error',
+                '-f', 'h264', '-framerate', str(self.fps), '-i', str(bitstream_path),
+                '-c:v', 'copy', '-movflags', '+faststart', str(output_path),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(stderr.decode(errors='replace').strip()[-500:])
+        finally:
+            bitstream_path.unlink(missing_ok=True)
+    
+    def _write_nvc_bitstream(self, downloaded: List[Tuple[Dict[str, Any], np.ndarray]], bitstream_path: Path):
+        """Encode each captioned still fps * duration_per_room times into a raw H.264 file."""
+        width, height = self.resolution
+        encoder = nvc.CreateEncoder(width, height, 'NV12', True, **NVC_ENCODER_PARAMS)
+        frames_per_room = self.fps * self.duration_per_room
+        
+        with open(bitstream_path, 'wb') as f:
+            for _, rgb in downloaded:
+                frame = _rgb_to_nv12(rgb)
+                for _ in range(frames_per_room):
+                    f.write(encoder.Encode(frame))
+            f.write(encoder.EndEncode())
+    
+    def _draw_label(self, img: Image.Image, room: Dict[str, Any]):
+        """Draw the room type (and dimensions) centred near the top of the frame."""
+        room_text = f"{room.get('room_type', 'Room')}"
+        if room.get('dimensions'):
+            room_text += f"\n{room['dimensions']}"
+        
+        draw = ImageDraw.Draw(img)
+        left, _, right, _ = draw.multiline_textbbox((0, 0), room_text, font=self._font, stroke_width=2, align='center')
+        draw.multiline_text(
+            ((img.width - (right - left)) // 2, 50),
+            room_text,
+            font=self._font,
+            fill='white',
+            stroke_width=2,
+            stroke_fill='black',
+            align='center'
+        )
+    
+    async def _download_images(self, rooms: List[Dict]) -> List[Tuple[Dict, np.ndarray]]:
         """
         Download room images from URLs.
         
         Returns:
-            List of paths to downloaded images
+            List of (room, captioned RGB frame) for rooms whose image was
+            downloaded; frames are views into one batch buffer
         """
-        local_paths = []
+        client = get_client()
+        # Every frame is resized straight into one preallocated batch buffer
+        width, height = self.resolution
+        frames = np.empty((len(rooms), height, width, 3), dtype=np.uint8)
         
-        for idx, room in enumerate(rooms):
+        async def fetch(idx: int, room: Dict):
             if room.get('status') != 'completed':
                 logger.warning(f"Skipping room {idx}: status is {room.get('status')}")
-                continue
+                return None
             
             image_url = room.get('image_url')
             if not image_url:
                 logger.warning(f"Skipping room {idx}: no image URL")
-                continue
+                return None
             
             try:
                 # Download image
-                response = requests.get(image_url, timeout=30)
+                response = await client.get(image_url, timeout=30.0, follow_redirects=True)
                 response.raise_for_status()
                 
-                # Save to temp file
-                img_path = self.temp_dir / f"room_{idx}.jpg"
-                img = Image.open(BytesIO(response.content))
-                
-                # Resize to standard resolution
-                img = img.resize(self.resolution, Image.Resampling.LANCZOS)
-                img = img.convert('RGB')  # Ensure RGB mode
-                img.save(img_path, 'JPEG', quality=95)
+                # Decode/resize/caption off the event loop
+                await asyncio.to_thread(self._process_image, room, response.content, frames[idx])
                 
-                local_paths.append(img_path)
                 logger.debug(f"Downloaded room image {idx + 1}/{len(rooms)}")
+                return room, frames[idx]
                 
             except Exception as e:
                 logger.error(f"Failed to download image for room {idx}: {e}")
-                continue
+                return None
+        
+        # All downloads overlap; results keep room order
+        results = await asyncio.gather(*(fetch(idx, room) for idx, room in enumerate(rooms)))
+        return [result for result in results if result is not None]
+    
+    def _process_image(self, room: Dict, data: bytes, frame: np.ndarray):
+        """
+        Decode a downloaded image, resize it into `frame` (an HxWx3 RGB slot
+        of the batch buffer) and caption it. Frames go to the encoder raw,
+        never back through JPEG.
+        """
+        if TURBOJPEG_AVAILABLE and data[:2] == b'\xff\xd8':
+            src = _JPEG.decode(data, pixel_format=TJPF_RGB)
+        else:
+            src = np.asarray(Image.open(BytesIO(data)).convert('RGB'))  # Ensure RGB mode
+        
+        # Resize to standard resolution
+        if self._resizer is not None:
+            resized = Image.new('RGB', self.resolution)
+            self._resizer.resize_pil(Image.fromarray(src), resized, self._resize_options)
+            frame[...] = np.asarray(resized)
+        else:
+            cv2.resize(src, self.resolution, dst=frame, interpolation=cv2.INTER_AREA)
         
-        return local_paths
+        img = Image.fromarray(frame)
+        self._draw_label(img, room)
+        frame[...] = np.asarray(img)
     
     def cleanup_temp_files(self):
-        """Remove temporary image and video files."""
+        """Remove intermediate files left behind by interrupted encodes."""
         try:
-            for file in self.temp_dir.glob("room_*.jpg"):
-                file.unlink()
-            logger.info("Cleaned up temporary image files")
+            for pattern in ("*_clip_*.mp4", "*_clips.txt", "*.h264"):
+                for file in self.temp_dir.glob(pattern):
+                    file.unlink()
+            logger.info("Cleaned up temporary encode files")
         except Exception as e:
             logger.warning(f"Failed to cleanup temp files: {e}")
@@ -3,9 +3,10 @@ Image Segmentation Service using Segment Anything Model (SAM)
 Detects objects in 360° tour images for editing
 """
 import os
+import hashlib
+from pathlib import Path
 import numpy as np
 from PIL import Image
-import requests
 import logging
 from typing import List, Dict, Any, Tuple, Optional
 import cv2
@@ -13,8 +14,63 @@ import base64
 import io
 import json
 
+from app.services.http_client import get_sync_client
+
 logger = logging.getLogger(__name__)
 
+# SAM detections and GPT-4o identifications keyed by image content + prompt
+SEGMENTATION_CACHE_DIR = Path(os.getenv('STORAGE_BASE_PATH', './storage')) / "cache" / "segmentation"
+
+SAM_CONFIDENCE = 0.95
+
+
+def _segmentation_cache_key(image_path: str, *params: Any) -> str:
+    """SHA-256 over the image bytes and the request parameters"""
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    for param in params:
+        digest.update(b"\0" + str(param).encode())
+    return digest.hexdigest()
+
+
+def mask_bbox(mask: np.ndarray) -> Optional[List[int]]:
+    """
+    Inclusive [x1, y1, x2, y2] of the non-zero pixels in a 2D bool/uint8
+    mask, or None if the mask is empty.
+    """
+    if mask.dtype == bool:
+        mask = mask.view(np.uint8)
+    x, y, w, h = cv2.boundingRect(mask)
+    if w == 0:
+        return None
+    return [x, y, x + w - 1, y + h - 1]
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """Bit-pack a binary (bool or 0/255) mask along its rows (8 pixels per byte)."""
+    return np.packbits(mask, axis=-1)
+
+
+def unpack_mask(mask_packed: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Inverse of pack_mask: boolean (H, W) mask."""
+    return np.unpackbits(mask_packed, axis=-1, count=shape[1]).view(bool)
+
+
+def materialize_mask(result: Dict[str, Any]) -> np.ndarray:
+    """
+    Boolean (H, W) mask for a detection result, built from either its
+    bit-packed mask or its rectangle (y1, y2, x1, x2).
+    """
+    shape = tuple(result['mask_shape'])
+    if result.get('mask_rect') is not None:
+        y1, y2, x1, x2 = result['mask_rect']
+        mask = np.zeros(shape, dtype=bool)
+        mask[y1:y2, x1:x2] = True
+        return mask
+    return unpack_mask(result['mask_packed'], shape)
+
 
 class SegmentationService:
     """Service for detecting and segmenting objects in images"""
@@ -39,7 +95,9 @@ class SegmentationService:
             
         Returns:
             {
-                'mask': binary mask of detected object,
+                'mask_packed': bit-packed binary mask (see unpack_mask),
+                'mask_rect': (y1, y2, x1, x2) for rectangular fallback masks,
+                'mask_shape': (height, width) of the mask,
                 'bbox': bounding box [x1, y1, x2, y2],
                 'confidence': detection confidence,
                 'mask_url': URL to mask image
@@ -52,26 +110,33 @@ class SegmentationService:
                 logger.warning("No Replicate API token found, using fallback method")
                 return self._fallback_object_detection(image_path, click_point)
             
-            # Load and encode image
-            with open(image_path, "rb") as f:
-                image_data = f.read()
-            
-            # Convert to base64 for API
-            image_b64 = base64.b64encode(image_data).decode('utf-8')
-            image_uri = f"data:image/png;base64,{image_b64}"
+            cache_path = SEGMENTATION_CACHE_DIR / f"sam_{_segmentation_cache_key(image_path, self.sam_model, click_point)}.npz"
+            if cache_path.exists():
+                with np.load(cache_path) as cached:
+                    logger.info(f"Reused cached SAM detection for {image_path}")
+                    return {
+                        'mask_packed': cached['mask_packed'],
+                        'mask_rect': None,
+                        'mask_shape': tuple(int(v) for v in cached['mask_shape']),
+                        'bbox': [int(v) for v in cached['bbox']],
+                        'confidence': SAM_CONFIDENCE,
+                        'mask_url': str(cached['mask_url'])
+                    }
             
             logger.info(f"Running SAM with click point: {click_point}")
             
-            # Run SAM with point prompt
-            output = replicate.run(
-                self.sam_model,
-                input={
-                    "image": image_uri,
-                    "point_coords": f"[{click_point[0]}, {click_point[1]}]" if click_point else None,
-                    "point_labels": "[1]",  # Foreground point
-                    "multimask_output": False
-                }
-            )
+            # Run SAM with point prompt; the client uploads the file handle
+            # itself (Files API on current clients) instead of a JSON data URI
+            with open(image_path, "rb") as image_file:
+                output = replicate.run(
+                    self.sam_model,
+                    input={
+                        "image": image_file,
+                        "point_coords": f"[{click_point[0]}, {click_point[1]}]" if click_point else None,
+                        "point_labels": "[1]",  # Foreground point
+                        "multimask_output": False
+                    }
+                )
             
             # Process mask
             if isinstance(output, dict) and 'masks' in output:
@@ -82,24 +147,31 @@ class SegmentationService:
                 mask_url = str(output)
             
             # Download mask
-            mask_response = requests.get(mask_url)
-            mask_image = Image.open(io.BytesIO(mask_response.content))
-            mask_array = np.array(mask_image.convert('L')) > 128  # Binary mask
+            mask_response = get_sync_client().get(mask_url, timeout=30.0)
+            mask_response.raise_for_status()
+            mask_gray = cv2.imdecode(np.frombuffer(mask_response.content, np.uint8), cv2.IMREAD_GRAYSCALE)
+            if mask_gray is None:
+                raise ValueError(f"Could not decode mask from {mask_url}")
+            _, mask_array = cv2.threshold(mask_gray, 128, 255, cv2.THRESH_BINARY)  # Binary mask
             
             # Find bounding box
-            coords = np.column_stack(np.where(mask_array > 0))
-            if len(coords) == 0:
+            bbox = mask_bbox(mask_array)
+            if bbox is None:
                 raise ValueError("No object detected at click point")
             
-            y1, x1 = coords.min(axis=0)
-            y2, x2 = coords.max(axis=0)
+            logger.info(f"Object detected with bbox: {bbox}")
             
-            logger.info(f"Object detected with bbox: [{x1}, {y1}, {x2}, {y2}]")
+            mask_packed = pack_mask(mask_array)
+            SEGMENTATION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                np.savez(f, mask_packed=mask_packed, mask_shape=mask_array.shape, bbox=bbox, mask_url=mask_url)
             
             return {
-                'mask': mask_array,
-                'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                'confidence': 0.95,
+                'mask_packed': mask_packed,
+                'mask_rect': None,
+                'mask_shape': mask_array.shape,
+                'bbox': bbox,
+                'confidence': SAM_CONFIDENCE,
                 'mask_url': mask_url
             }
             
@@ -115,15 +187,13 @@ class SegmentationService:
     ) -> Dict[str, Any]:
         """
         Fallback object detection using OpenCV when SAM is not available.
-        Creates a rectangular region around the click point.
+        Creates a rectangular region around the click point, returned as
+        'mask_rect' (see materialize_mask) rather than a full raster.
         """
         try:
-            # Load image
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not load image: {image_path}")
-            
-            h, w = img.shape[:2]
+            # Only the dimensions are needed, which PIL reads from the header
+            with Image.open(image_path) as img:
+                w, h = img.size
             
             if click_point:
                 # Create region around click point
@@ -134,12 +204,10 @@ class SegmentationService:
                 x2 = min(w, x + region_size // 2)
                 y2 = min(h, y + region_size // 2)
                 
-                # Create mask
-                mask = np.zeros((h, w), dtype=bool)
-                mask[y1:y2, x1:x2] = True
-                
                 return {
-                    'mask': mask,
+                    'mask_packed': None,
+                    'mask_rect': (y1, y2, x1, x2),
+                    'mask_shape': (h, w),
                     'bbox': [int(x1), int(y1), int(x2), int(y2)],
                     'confidence': 0.7,
                     'mask_url': None
@@ -148,11 +216,11 @@ class SegmentationService:
                 # Default to center region
                 x1, y1 = w // 4, h // 4
                 x2, y2 = 3 * w // 4, 3 * h // 4
-                mask = np.zeros((h, w), dtype=bool)
-                mask[y1:y2, x1:x2] = True
                 
                 return {
-                    'mask': mask,
+                    'mask_packed': None,
+                    'mask_rect': (y1, y2, x1, x2),
+                    'mask_shape': (h, w),
                     'bbox': [int(x1), int(y1), int(x2), int(y2)],
                     'confidence': 0.5,
                     'mask_url': None
@@ -193,6 +261,11 @@ class SegmentationService:
                 logger.warning("No OpenAI API key found, using fallback identification")
                 return self._fallback_object_identification()
             
+            cache_path = SEGMENTATION_CACHE_DIR / f"identify_{_segmentation_cache_key(image_path, list(bbox))}.json"
+            if cache_path.exists():
+                logger.info(f"Reused cached identification for {image_path}")
+                return json.loads(cache_path.read_text())
+            
             client = OpenAI(api_key=openai_key)
             
             # Load and crop image to bounding box
@@ -205,9 +278,10 @@ class SegmentationService:
             
             cropped = img.crop((x1, y1, x2, y2))
             
-            # Convert to base64
+            # GPT-4o downsamples to ~1024px anyway; send a JPEG that size
+            cropped.thumbnail((1024, 1024), Image.Resampling.BILINEAR)
             buffered = io.BytesIO()
-            cropped.save(buffered, format="PNG")
+            cropped.convert('RGB').save(buffered, format="JPEG", quality=85, optimize=True)
             img_base64 = base64.b64encode(buffered.getvalue()).decode()
             
             # GPT-4 Vision analysis
@@ -230,7 +304,7 @@ class SegmentationService:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{img_base64}"
+                                "url": f"data:image/jpeg;base64,{img_base64}"
                             }
                         }
                     ]
@@ -250,6 +324,9 @@ class SegmentationService:
             
             result = json.loads(content.strip())
             logger.info(f"Identified object: {result}")
+            
+            SEGMENTATION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(result))
             return result
             
         except Exception as e:
@@ -1,14 +1,29 @@
 """
 Text-to-3D House Generation Service for Meshy
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import asyncio
+import hashlib
 import logging
-import requests
 import os
-import time
+import aiofiles
+
+from app.services.http_client import get_client
 
 logger = logging.getLogger(__name__)
 
+# Task polling: first check after 2 s, growing 1.5x per attempt up to 15 s
+POLL_INITIAL_DELAY = 2.0
+POLL_BACKOFF = 1.5
+POLL_MAX_DELAY = 15.0
+
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Refined GLBs are served from here; the connection is opened while the
+# refine task is finishing so the download skips the handshake
+MESHY_ASSET_HOST = "https://assets.meshy.ai"
+PREWARM_PROGRESS = 95
+
 class MeshyTextTo3DService:
     def __init__(self):
         from dotenv import load_dotenv
@@ -18,7 +33,7 @@ class MeshyTextTo3DService:
         if self.meshy_api_key:
             logger.info("Meshy Text-to-3D API enabled.")
 
-    def generate_3d_from_prompt(self, prompt: str, output_dir: str = "./storage/generated_3d_models") -> Dict[str, Any]:
+    async def generate_3d_from_prompt(self, prompt: str, output_dir: str = "./storage/generated_3d_models") -> Dict[str, Any]:
         if not self.meshy_api_key:
             raise ValueError("No Meshy API key configured")
         
@@ -44,7 +59,7 @@ class MeshyTextTo3DService:
         }
         
         logger.info(f"Starting Meshy v2 text-to-3d PREVIEW for prompt: {enhanced_prompt}")
-        response = requests.post(self.meshy_text_api_url, headers=headers, json=preview_payload)
+        response = await get_client().post(self.meshy_text_api_url, headers=headers, json=preview_payload)
         
         if response.status_code not in (200, 201, 202):
             logger.error(f"Meshy Preview API error: {response.status_code} - {response.text}")
@@ -57,7 +72,7 @@ class MeshyTextTo3DService:
         logger.info(f"Preview task {preview_task_id} created. Waiting for completion...")
         
         # Poll for Preview completion (Increased timeout for Meshy-6)
-        if not self._poll_task(preview_task_id, headers, max_wait=300, context="Preview"):
+        if not await self._poll_task(preview_task_id, headers, max_wait=300, context="Preview"):
              return {"success": False, "reason": "Preview generation timed out"}
              
         logger.info(f"Preview task {preview_task_id} completed. Starting refinement...")
@@ -69,7 +84,7 @@ class MeshyTextTo3DService:
             'texture_richness': 'high' 
         }
         
-        response = requests.post(self.meshy_text_api_url, headers=headers, json=refine_payload)
+        response = await get_client().post(self.meshy_text_api_url, headers=headers, json=refine_payload)
         
         if response.status_code not in (200, 201, 202):
             logger.error(f"Meshy Refine API error: {response.status_code} - {response.text}")
@@ -82,7 +97,9 @@ class MeshyTextTo3DService:
         logger.info(f"Refine task {refine_task_id} created. Waiting for completion...")
         
         # Poll for Refine completion (Increased timeout)
-        final_status = self._poll_task(refine_task_id, headers, max_wait=600, context="Refine", return_result=True)
+        final_status = await self._poll_task(
+            refine_task_id, headers, max_wait=600, context="Refine", return_result=True, prewarm_url=MESHY_ASSET_HOST
+        )
         
         if not final_status:
             return {"success": False, "reason": "Refine generation timed out"}
@@ -98,29 +115,34 @@ class MeshyTextTo3DService:
         logger.info(f"Downloading refined model from {glb_url}")
         
         try:
-            model_response = requests.get(glb_url, timeout=120)
+            os.makedirs(output_dir, exist_ok=True)
+            filename = f"meshy_text_refined_{refine_task_id}.glb"
+            output_path = os.path.join(output_dir, filename)
             
-            if model_response.status_code != 200:
-                logger.error(f"Failed to download GLB: HTTP {model_response.status_code}")
-                return {"success": False, "reason": f"Failed to download refined model: HTTP {model_response.status_code}"}
+            # Stream to disk so large textured GLBs are never held in memory
+            hasher = hashlib.blake2b()
+            content_length = 0
+            head = b""
+            async with get_client().stream("GET", glb_url, timeout=120.0, follow_redirects=True) as model_response:
+                if model_response.status_code != 200:
+                    logger.error(f"Failed to download GLB: HTTP {model_response.status_code}")
+                    return {"success": False, "reason": f"Failed to download refined model: HTTP {model_response.status_code}"}
+                
+                async with aiofiles.open(output_path, 'wb') as f:
+                    async for chunk in model_response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        if len(head) < 500:
+                            head += chunk[:500 - len(head)]
+                        await f.write(chunk)
+                        hasher.update(chunk)
+                        content_length += len(chunk)
             
-            content_length = len(model_response.content)
             logger.info(f"Downloaded model size: {content_length} bytes ({content_length / 1024:.2f} KB)")
             
             if content_length < 1000:  # Less than 1KB is suspicious
                 logger.warning(f"Downloaded file is suspiciously small: {content_length} bytes")
-                logger.warning(f"Response content: {model_response.content[:500]}")
+                logger.warning(f"Response content: {head}")
             
-            os.makedirs(output_dir, exist_ok=True)
-            filename = f"meshy_text_refined_{refine_task_id}.glb"
-            output_path = os.path.join(output_dir, filename)
-            
-            with open(output_path, 'wb') as f:
-                f.write(model_response.content)
-            
-            # Verify file was written
-            file_size = os.path.getsize(output_path)
-            logger.info(f"Refined model saved to {output_path} (verified: {file_size} bytes)")
+            logger.info(f"Refined model saved to {output_path} (blake2b: {hasher.hexdigest()})")
             
             # Web-accessible URL - use absolute path for backend server
             clean_dir = output_dir.lstrip("./")
@@ -139,33 +161,61 @@ class MeshyTextTo3DService:
             logger.error(f"Error downloading/saving GLB file: {e}")
             return {"success": False, "reason": f"Download error: {str(e)}"}
 
-    def _poll_task(self, task_id: str, headers: Dict, max_wait: int, context: str, return_result: bool = False):
-        start_time = time.time()
-        while (time.time() - start_time) < max_wait:
+    async def _poll_task(
+        self,
+        task_id: str,
+        headers: Dict,
+        max_wait: int,
+        context: str,
+        return_result: bool = False,
+        prewarm_url: Optional[str] = None
+    ):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        delay = POLL_INITIAL_DELAY
+        etag = None
+        prewarm_task = None
+        while loop.time() < deadline:
             try:
-                response = requests.get(f"{self.meshy_text_api_url}/{task_id}", headers=headers)
-                if response.status_code != 200:
+                # Unchanged task state comes back as an empty 304
+                poll_headers = {**headers, 'If-None-Match': etag} if etag else headers
+                response = await get_client().get(f"{self.meshy_text_api_url}/{task_id}", headers=poll_headers)
+                if response.status_code == 304:
+                    logger.debug(f"[{context}] Task {task_id}: unchanged")
+                elif response.status_code != 200:
                     logger.warning(f"{context} task polling failed: {response.status_code}")
-                    time.sleep(5)
-                    continue
+                else:
+                    etag = response.headers.get('ETag')
+                    data = response.json()
+                    status = data.get('status')
+                    progress = data.get('progress', 0)
                     
-                data = response.json()
-                status = data.get('status')
-                progress = data.get('progress', 0)
-                
-                logger.info(f"[{context}] Task {task_id}: {status} - {progress}%")
-                
-                if status == 'SUCCEEDED':
-                    return data if return_result else True
-                elif status == 'FAILED':
-                    error = data.get('task_error', {}).get('message', 'Unknown error')
-                    logger.error(f"{context} task failed: {error}")
-                    return False
+                    logger.info(f"[{context}] Task {task_id}: {status} - {progress}%")
+                    
+                    if prewarm_url and prewarm_task is None and status == 'IN_PROGRESS' and progress >= PREWARM_PROGRESS:
+                        prewarm_task = asyncio.create_task(self._warm_connection(prewarm_url))
+                    
+                    if status == 'SUCCEEDED':
+                        return data if return_result else True
+                    elif status == 'FAILED':
+                        error = data.get('task_error', {}).get('message', 'Unknown error')
+                        logger.error(f"{context} task failed: {error}")
+                        return False
                     
             except Exception as e:
                 logger.error(f"Polling error: {e}")
-                
-            time.sleep(5)
+            
+            # Back off while the task is still running
+            await asyncio.sleep(delay)
+            delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
             
         logger.error(f"{context} task timed out after {max_wait}s")
         return False
+    
+    @staticmethod
+    async def _warm_connection(url: str):
+        """Open a pooled keep-alive connection to url ahead of the real request"""
+        try:
+            await get_client().head(url, timeout=10.0)
+        except Exception as e:
+            logger.debug(f"Connection prewarm to {url} failed: {e}")
@@ -2,120 +2,213 @@
 UDA (Urban Development Authority) House Regulations Validator.
 Validates residential house designs against Sri Lankan UDA building regulations.
 """
-from typing import Dict, Any, List, Optional
+from functools import cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from decimal import Decimal
 import logging
+import sys
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Houses with at least this many matched rooms compare room sizes with NumPy
+ROOM_VECTORIZE_MIN = 8
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Recursively wrap dicts in read-only MappingProxyType views and intern
+    their keys and string values.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({
+            sys.intern(key): _freeze(item) for key, item in value.items()
+        })
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Plain-dict copy of a _freeze'd structure."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+# UDA house building regulations, built once at import and shared read-only
+# by every validator instance
+_UDA_REGULATIONS = _freeze({
+    "setbacks": {
+        "front_setback": {
+            "minimum": 10.0,  # feet
+            "description": "Minimum front setback from road boundary",
+            "regulation": "UDA Regulation 2.1.1"
+        },
+        "rear_setback": {
+            "minimum": 10.0,  # feet
+            "description": "Minimum rear setback",
+            "regulation": "UDA Regulation 2.1.2"
+        },
+        "side_setback": {
+            "minimum": 5.0,  # feet
+            "description": "Minimum side setback",
+            "regulation": "UDA Regulation 2.1.3"
+        }
+    },
+    "coverage": {
+        "max_building_coverage": {
+            "residential": 65.0,  # percentage
+            "description": "Maximum building coverage for residential plots",
+            "regulation": "UDA Regulation 3.2.1"
+        }
+    },
+    "height": {
+        "max_floors": {
+            "value": 3,
+            "description": "Maximum number of floors for residential buildings (without special approval)",
+            "regulation": "UDA Regulation 4.1.1"
+        },
+        "max_height": {
+            "value": 35.0,  # feet
+            "description": "Maximum building height for residential buildings",
+            "regulation": "UDA Regulation 4.1.2"
+        },
+        "floor_height": {
+            "minimum": 9.0,  # feet
+            "maximum": 12.0,  # feet
+            "description": "Recommended floor to ceiling height",
+            "regulation": "UDA Regulation 4.2.1"
+        }
+    },
+    "rooms": {
+        "bedroom": {
+            "min_area": 100.0,  # sq ft
+            "min_width": 9.0,  # feet
+            "min_ventilation": 10.0,  # percentage of floor area
+            "description": "Minimum bedroom requirements",
+            "regulation": "UDA Regulation 5.1.1"
+        },
+        "living_room": {
+            "min_area": 120.0,  # sq ft
+            "min_width": 10.0,  # feet
+            "description": "Minimum living room requirements",
+            "regulation": "UDA Regulation 5.2.1"
+        },
+        "kitchen": {
+            "min_area": 60.0,  # sq ft
+            "min_width": 6.0,  # feet
+            "min_ventilation": 20.0,  # percentage of floor area
+            "description": "Minimum kitchen requirements",
+            "regulation": "UDA Regulation 5.3.1"
+        },
+        "bathroom": {
+            "min_area": 35.0,  # sq ft
+            "min_width": 5.0,  # feet
+            "min_ventilation": 15.0,  # percentage of floor area
+            "description": "Minimum bathroom requirements",
+            "regulation": "UDA Regulation 5.4.1"
+        }
+    },
+    "ventilation": {
+        "min_window_area": {
+            "value": 10.0,  # percentage of floor area
+            "description": "Minimum window area for natural ventilation",
+            "regulation": "UDA Regulation 6.1.1"
+        },
+        "cross_ventilation": {
+            "required": True,
+            "description": "Cross ventilation required for all habitable rooms",
+            "regulation": "UDA Regulation 6.2.1"
+        }
+    },
+    "parking": {
+        "residential": {
+            "min_spaces": 1,
+            "space_size": "9ft x 18ft",
+            "description": "Minimum parking requirement for residential houses",
+            "regulation": "UDA Regulation 7.1.1"
+        }
+    },
+    "septic_tank": {
+        "min_distance_from_well": 50.0,  # feet
+        "min_distance_from_building": 10.0,  # feet
+        "description": "Septic tank location requirements",
+        "regulation": "UDA Regulation 8.1.1"
+    }
+})
+
+# Ventilation recommendations are the same for every design; reports share
+# these entries (plain dicts so reports stay JSON-serializable)
+VENTILATION_RECOMMENDATIONS = (
+    {
+        "category": "Ventilation",
+        "message": "Ensure all habitable rooms have minimum 10% window area for natural ventilation",
+        "regulation": "UDA Regulation 6.1.1"
+    },
+    {
+        "category": "Ventilation",
+        "message": "Provide cross ventilation in all bedrooms and living areas",
+        "regulation": "UDA Regulation 6.2.1"
+    },
+)
+
 
 class UDAHouseValidator:
     """Validator for UDA house building regulations in Sri Lanka."""
     
     def __init__(self):
         """Initialize UDA house validator with regulation rules."""
-        self.regulations = self._load_uda_house_regulations()
-    
-    def _load_uda_house_regulations(self) -> Dict[str, Any]:
-        """Load UDA house building regulations."""
-        return {
-            "setbacks": {
-                "front_setback": {
-                    "minimum": 10.0,  # feet
-                    "description": "Minimum front setback from road boundary",
-                    "regulation": "UDA Regulation 2.1.1"
-                },
-                "rear_setback": {
-                    "minimum": 10.0,  # feet
-                    "description": "Minimum rear setback",
-                    "regulation": "UDA Regulation 2.1.2"
-                },
-                "side_setback": {
-                    "minimum": 5.0,  # feet
-                    "description": "Minimum side setback",
-                    "regulation": "UDA Regulation 2.1.3"
-                }
-            },
-            "coverage": {
-                "max_building_coverage": {
-                    "residential": 65.0,  # percentage
-                    "description": "Maximum building coverage for residential plots",
-                    "regulation": "UDA Regulation 3.2.1"
-                }
-            },
-            "height": {
-                "max_floors": {
-                    "value": 3,
-                    "description": "Maximum number of floors for residential buildings (without special approval)",
-                    "regulation": "UDA Regulation 4.1.1"
-                },
-                "max_height": {
-                    "value": 35.0,  # feet
-                    "description": "Maximum building height for residential buildings",
-                    "regulation": "UDA Regulation 4.1.2"
-                },
-                "floor_height": {
-                    "minimum": 9.0,  # feet
-                    "maximum": 12.0,  # feet
-                    "description": "Recommended floor to ceiling height",
-                    "regulation": "UDA Regulation 4.2.1"
-                }
-            },
-            "rooms": {
-                "bedroom": {
-                    "min_area": 100.0,  # sq ft
-                    "min_width": 9.0,  # feet
-                    "min_ventilation": 10.0,  # percentage of floor area
-                    "description": "Minimum bedroom requirements",
-                    "regulation": "UDA Regulation 5.1.1"
-                },
-                "living_room": {
-                    "min_area": 120.0,  # sq ft
-                    "min_width": 10.0,  # feet
-                    "description": "Minimum living room requirements",
-                    "regulation": "UDA Regulation 5.2.1"
-                },
-                "kitchen": {
-                    "min_area": 60.0,  # sq ft
-                    "min_width": 6.0,  # feet
-                    "min_ventilation": 20.0,  # percentage of floor area
-                    "description": "Minimum kitchen requirements",
-                    "regulation": "UDA Regulation 5.3.1"
-                },
-                "bathroom": {
-                    "min_area": 35.0,  # sq ft
-                    "min_width": 5.0,  # feet
-                    "min_ventilation": 15.0,  # percentage of floor area
-                    "description": "Minimum bathroom requirements",
-                    "regulation": "UDA Regulation 5.4.1"
-                }
-            },
-            "ventilation": {
-                "min_window_area": {
-                    "value": 10.0,  # percentage of floor area
-                    "description": "Minimum window area for natural ventilation",
-                    "regulation": "UDA Regulation 6.1.1"
-                },
-                "cross_ventilation": {
-                    "required": True,
-                    "description": "Cross ventilation required for all habitable rooms",
-                    "regulation": "UDA Regulation 6.2.1"
-                }
-            },
-            "parking": {
-                "residential": {
-                    "min_spaces": 1,
-                    "space_size": "9ft x 18ft",
-                    "description": "Minimum parking requirement for residential houses",
-                    "regulation": "UDA Regulation 7.1.1"
-                }
-            },
-            "septic_tank": {
-                "min_distance_from_well": 50.0,  # feet
-                "min_distance_from_building": 10.0,  # feet
-                "description": "Septic tank location requirements",
-                "regulation": "UDA Regulation 8.1.1"
+        self.regulations = _UDA_REGULATIONS
+        
+        # Flat thresholds and regulation ids for the validation hot path;
+        # the nested mapping is kept for get_regulations_summary
+        setbacks = self.regulations["setbacks"]
+        self._min_front = setbacks["front_setback"]["minimum"]
+        self._front_reg_id = setbacks["front_setback"]["regulation"]
+        self._min_rear = setbacks["rear_setback"]["minimum"]
+        self._rear_reg_id = setbacks["rear_setback"]["regulation"]
+        self._min_side = setbacks["side_setback"]["minimum"]
+        self._side_reg_id = setbacks["side_setback"]["regulation"]
+        
+        coverage = self.regulations["coverage"]["max_building_coverage"]
+        self._max_coverage = coverage["residential"]
+        self._coverage_reg_id = coverage["regulation"]
+        
+        height = self.regulations["height"]
+        self._max_floors = height["max_floors"]["value"]
+        self._floors_reg_id = height["max_floors"]["regulation"]
+        self._max_height = height["max_height"]["value"]
+        self._height_reg_id = height["max_height"]["regulation"]
+        
+        parking = self.regulations["parking"]["residential"]
+        self._min_parking = parking["min_spaces"]
+        self._parking_reg_id = parking["regulation"]
+        
+        # Room type -> (min_area, min_width, regulation id), with the common
+        # spellings that the substring match would resolve to the same entry
+        room_rules = {
+            key: (reg.get("min_area", 0), reg.get("min_width", 0), reg["regulation"])
+            for key, reg in self.regulations["rooms"].items()
+        }
+        self._room_reg_by_type = dict(room_rules)
+        self._room_reg_by_type.update({
+            "master bedroom": room_rules["bedroom"],
+            "guest bedroom": room_rules["bedroom"],
+            "master bathroom": room_rules["bathroom"],
+        })
+        
+        # Size passed-check entries carry no measured value, so the ones for
+        # known room types are built once and shared by every report
+        self._room_size_passes = {
+            room_type: {
+                "rule": f"{room_type.title()} Size",
+                "message": f"{room_type.title()} area meets minimum requirement",
+                "regulation": rule[2]
             }
+            for room_type, rule in self._room_reg_by_type.items()
         }
     
     def validate_house_design(
@@ -133,44 +226,205 @@ class UDAHouseValidator:
         Returns:
             Validation report with compliance status and violations
         """
+        # Compliant plots and buildings take the single comparison chain in
+        # _passed_site_checks, which already yields their passed entries
+        return self._build_report(
+            building_data,
+            plot_data,
+            self._passed_site_checks(building_data, plot_data)
+        )
+    
+    def validate_many(
+        self,
+        buildings: List[Dict[str, Any]],
+        plots: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Validate a batch of house designs against UDA regulations.
+        
+        The setback, coverage and height thresholds are compared for the
+        whole batch at once with NumPy; only designs that fail one of them
+        go through the individual site validators.
+        
+        Args:
+            buildings: Building parameters for each design
+            plots: Plot parameters for each design (same length as
+                buildings), or None if no plot data is available
+            
+        Returns:
+            One validation report per design, identical to what
+            validate_house_design returns for it
+        """
+        if plots is None:
+            plots = [None] * len(buildings)
+        elif len(plots) != len(buildings):
+            raise ValueError(
+                f"Got {len(plots)} plots for {len(buildings)} buildings"
+            )
+        
+        site_ok = self._site_checks_vectorized(buildings, plots)
+        return [
+            self._build_report(
+                building_data,
+                plot_data,
+                self._site_passed_entries(building_data, plot_data) if ok else None
+            )
+            for building_data, plot_data, ok in zip(buildings, plots, site_ok)
+        ]
+    
+    def _build_report(
+        self,
+        building_data: Dict[str, Any],
+        plot_data: Optional[Dict[str, Any]],
+        passed_site_checks: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Run the remaining checks and score the design. passed_site_checks
+        holds the site entries when all site thresholds are known to pass,
+        otherwise None to run the individual site validators.
+        """
+        violations = []
+        warnings = []
+        
+        # is_compliant and compliance_score are filled in once the checks ran
         validation_results = {
-            "is_compliant": True,
-            "compliance_score": 100.0,
-            "violations": [],
-            "warnings": [],
-            "passed_checks": [],
+            "is_compliant": None,
+            "compliance_score": None,
+            "violations": violations,
+            "warnings": warnings,
+            "passed_checks": passed_site_checks if passed_site_checks is not None else [],
             "recommendations": []
         }
         
         # Run all validation checks
-        self._validate_setbacks(building_data, plot_data, validation_results)
-        self._validate_coverage(building_data, plot_data, validation_results)
-        self._validate_height(building_data, validation_results)
+        if passed_site_checks is None:
+            self._validate_setbacks(building_data, plot_data, validation_results)
+            self._validate_coverage(building_data, plot_data, validation_results)
+            self._validate_height(building_data, validation_results)
         self._validate_rooms(building_data, validation_results)
         self._validate_ventilation(building_data, validation_results)
         self._validate_parking(building_data, validation_results)
         
-        # Calculate compliance score
-        total_checks = (
-            len(validation_results["violations"]) +
-            len(validation_results["warnings"]) +
-            len(validation_results["passed_checks"])
+        # Calculate compliance score; violations reduce score more than
+        # warnings, and with neither the score stays at 100
+        violation_count = len(violations)
+        validation_results["compliance_score"] = max(
+            0.0,
+            100.0 - violation_count * 15 - len(warnings) * 5
         )
         
-        if total_checks > 0:
-            # Violations reduce score more than warnings
-            violation_penalty = len(validation_results["violations"]) * 15
-            warning_penalty = len(validation_results["warnings"]) * 5
-            validation_results["compliance_score"] = max(
-                0.0,
-                100.0 - violation_penalty - warning_penalty
-            )
-        
         # Set overall compliance status
-        validation_results["is_compliant"] = len(validation_results["violations"]) == 0
+        validation_results["is_compliant"] = violation_count == 0
         
         return validation_results
     
+    def _passed_site_checks(
+        self,
+        building_data: Dict[str, Any],
+        plot_data: Optional[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Passed-check entries for the setback, coverage and height rules when
+        all of them pass, or None if any would be a violation or warning
+        (the caller then runs the individual validators).
+        """
+        if not plot_data:
+            return None
+        
+        front_setback = plot_data.get("front_setback", 0)
+        rear_setback = plot_data.get("rear_setback", 0)
+        side_setback = plot_data.get("side_setback", 0)
+        building_coverage = building_data.get("building_coverage", 0)
+        floor_count = building_data.get("floor_count", 1)
+        building_height = building_data.get("building_height", 0)
+        
+        if (
+            front_setback < self._min_front
+            or rear_setback < self._min_rear
+            or side_setback < self._min_side
+            or building_coverage > self._max_coverage
+            or floor_count > self._max_floors
+            or building_height > self._max_height
+        ):
+            return None
+        
+        return self._site_passed_entries(building_data, plot_data)
+    
+    def _site_checks_vectorized(
+        self,
+        buildings: List[Dict[str, Any]],
+        plots: List[Optional[Dict[str, Any]]]
+    ) -> List[bool]:
+        """
+        Per design, whether every setback, coverage and height threshold
+        passes (the _passed_site_checks condition), compared with NumPy.
+        """
+        count = len(buildings)
+        
+        def column(rows, key, default):
+            return np.fromiter(
+                ((row.get(key, default) if row else default) for row in rows),
+                dtype=float,
+                count=count
+            )
+        
+        # Negated "<" / ">" so values that fail every comparison (NaN) are
+        # treated the way the scalar validators treat them
+        site_ok = np.fromiter((bool(plot) for plot in plots), dtype=bool, count=count)
+        site_ok &= ~(column(plots, "front_setback", 0) < self._min_front)
+        site_ok &= ~(column(plots, "rear_setback", 0) < self._min_rear)
+        site_ok &= ~(column(plots, "side_setback", 0) < self._min_side)
+        site_ok &= ~(column(buildings, "building_coverage", 0) > self._max_coverage)
+        site_ok &= ~(column(buildings, "floor_count", 1) > self._max_floors)
+        site_ok &= ~(column(buildings, "building_height", 0) > self._max_height)
+        return site_ok.tolist()
+    
+    def _site_passed_entries(
+        self,
+        building_data: Dict[str, Any],
+        plot_data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Passed-check entries for a design that passes every site threshold."""
+        front_setback = plot_data.get("front_setback", 0)
+        rear_setback = plot_data.get("rear_setback", 0)
+        side_setback = plot_data.get("side_setback", 0)
+        building_coverage = building_data.get("building_coverage", 0)
+        floor_count = building_data.get("floor_count", 1)
+        building_height = building_data.get("building_height", 0)
+        
+        return [
+            {
+                "rule": "Front Setback",
+                "message": f"Front setback {front_setback}ft meets minimum requirement",
+                "regulation": self._front_reg_id
+            },
+            {
+                "rule": "Rear Setback",
+                "message": f"Rear setback {rear_setback}ft meets minimum requirement",
+                "regulation": self._rear_reg_id
+            },
+            {
+                "rule": "Side Setback",
+                "message": f"Side setback {side_setback}ft meets minimum requirement",
+                "regulation": self._side_reg_id
+            },
+            {
+                "rule": "Building Coverage",
+                "message": f"Building coverage {building_coverage}% is within limit",
+                "regulation": self._coverage_reg_id
+            },
+            {
+                "rule": "Floor Count",
+                "message": f"Floor count {floor_count} is within limit",
+                "regulation": self._floors_reg_id
+            },
+            {
+                "rule": "Building Height",
+                "message": f"Building height {building_height}ft is within limit",
+                "regulation": self._height_reg_id
+            }
+        ]
+    
     def _validate_setbacks(
         self,
         building_data: Dict[str, Any],
@@ -186,57 +440,58 @@ class UDAHouseValidator:
             })
             return
         
-        setback_rules = self.regulations["setbacks"]
+        add_violation = results["violations"].append
+        add_pass = results["passed_checks"].append
         
         # Check front setback
         front_setback = plot_data.get("front_setback", 0)
-        min_front = setback_rules["front_setback"]["minimum"]
+        min_front = self._min_front
         if front_setback < min_front:
-            results["violations"].append({
+            add_violation({
                 "rule": "Front Setback",
                 "message": f"Front setback {front_setback}ft is less than minimum required {min_front}ft",
-                "regulation": setback_rules["front_setback"]["regulation"],
+                "regulation": self._front_reg_id,
                 "severity": "ERROR"
             })
         else:
-            results["passed_checks"].append({
+            add_pass({
                 "rule": "Front Setback",
                 "message": f"Front setback {front_setback}ft meets minimum requirement",
-                "regulation": setback_rules["front_setback"]["regulation"]
+                "regulation": self._front_reg_id
             })
         
         # Check rear setback
         rear_setback = plot_data.get("rear_setback", 0)
-        min_rear = setback_rules["rear_setback"]["minimum"]
+        min_rear = self._min_rear
         if rear_setback < min_rear:
-            results["violations"].append({
+            add_violation({
                 "rule": "Rear Setback",
                 "message": f"Rear setback {rear_setback}ft is less than minimum required {min_rear}ft",
-                "regulation": setback_rules["rear_setback"]["regulation"],
+                "regulation": self._rear_reg_id,
                 "severity": "ERROR"
             })
         else:
-            results["passed_checks"].append({
+            add_pass({
                 "rule": "Rear Setback",
                 "message": f"Rear setback {rear_setback}ft meets minimum requirement",
-                "regulation": setback_rules["rear_setback"]["regulation"]
+                "regulation": self._rear_reg_id
             })
         
         # Check side setbacks
         side_setback = plot_data.get("side_setback", 0)
-        min_side = setback_rules["side_setback"]["minimum"]
+        min_side = self._min_side
         if side_setback < min_side:
-            results["violations"].append({
+            add_violation({
                 "rule": "Side Setback",
                 "message": f"Side setback {side_setback}ft is less than minimum required {min_side}ft",
-                "regulation": setback_rules["side_setback"]["regulation"],
+                "regulation": self._side_reg_id,
                 "severity": "ERROR"
             })
         else:
-            results["passed_checks"].append({
+            add_pass({
                 "rule": "Side Setback",
                 "message": f"Side setback {side_setback}ft meets minimum requirement",
-                "regulation": setback_rules["side_setback"]["regulation"]
+                "regulation": self._side_reg_id
             })
     
     def _validate_coverage(
@@ -247,20 +502,20 @@ class UDAHouseValidator:
     ) -> None:
         """Validate building coverage requirements."""
         building_coverage = building_data.get("building_coverage", 0)
-        max_coverage = self.regulations["coverage"]["max_building_coverage"]["residential"]
+        max_coverage = self._max_coverage
         
         if building_coverage > max_coverage:
             results["violations"].append({
                 "rule": "Building Coverage",
                 "message": f"Building coverage {building_coverage}% exceeds maximum allowed {max_coverage}%",
-                "regulation": self.regulations["coverage"]["max_building_coverage"]["regulation"],
+                "regulation": self._coverage_reg_id,
                 "severity": "ERROR"
             })
         else:
             results["passed_checks"].append({
                 "rule": "Building Coverage",
                 "message": f"Building coverage {building_coverage}% is within limit",
-                "regulation": self.regulations["coverage"]["max_building_coverage"]["regulation"]
+                "regulation": self._coverage_reg_id
             })
     
     def _validate_height(
@@ -271,37 +526,38 @@ class UDAHouseValidator:
         """Validate building height requirements."""
         floor_count = building_data.get("floor_count", 1)
         building_height = building_data.get("building_height", 0)
+        add_pass = results["passed_checks"].append
         
         # Check floor count
-        max_floors = self.regulations["height"]["max_floors"]["value"]
+        max_floors = self._max_floors
         if floor_count > max_floors:
             results["warnings"].append({
                 "rule": "Floor Count",
                 "message": f"Building has {floor_count} floors, exceeds typical limit of {max_floors} (may require special approval)",
-                "regulation": self.regulations["height"]["max_floors"]["regulation"],
+                "regulation": self._floors_reg_id,
                 "severity": "WARNING"
             })
         else:
-            results["passed_checks"].append({
+            add_pass({
                 "rule": "Floor Count",
                 "message": f"Floor count {floor_count} is within limit",
-                "regulation": self.regulations["height"]["max_floors"]["regulation"]
+                "regulation": self._floors_reg_id
             })
         
         # Check building height
-        max_height = self.regulations["height"]["max_height"]["value"]
+        max_height = self._max_height
         if building_height > max_height:
             results["violations"].append({
                 "rule": "Building Height",
                 "message": f"Building height {building_height}ft exceeds maximum {max_height}ft",
-                "regulation": self.regulations["height"]["max_height"]["regulation"],
+                "regulation": self._height_reg_id,
                 "severity": "ERROR"
             })
         else:
-            results["passed_checks"].append({
+            add_pass({
                 "rule": "Building Height",
                 "message": f"Building height {building_height}ft is within limit",
-                "regulation": self.regulations["height"]["max_height"]["regulation"]
+                "regulation": self._height_reg_id
             })
     
     def _validate_rooms(
@@ -320,51 +576,80 @@ class UDAHouseValidator:
             })
             return
         
-        room_regulations = self.regulations["rooms"]
+        room_reg_by_type = self._room_reg_by_type
+        add_violation = results["violations"].append
+        add_pass = results["passed_checks"].append
+        room_size_passes = self._room_size_passes
         
+        # (room_type, area, width, (min_area, min_width, regulation)) for
+        # every room with a matching regulation
+        matched = []
         for room in rooms:
-            room_type = room.get("type", "").lower()
-            room_area = room.get("area", 0)
-            room_width = room.get("width", 0)
-            
-            # Find matching regulation
-            reg_key = None
-            for key in room_regulations.keys():
-                if key in room_type:
-                    reg_key = key
-                    break
+            room_type = (room.get("type") or "").lower()
             
-            if not reg_key:
-                continue
+            # Find matching regulation: exact type first, then substring
+            room_reg = room_reg_by_type.get(room_type)
+            if room_reg is None:
+                room_reg = next(
+                    (reg for key, reg in room_reg_by_type.items() if key in room_type),
+                    None
+                )
+                if room_reg is None:
+                    continue
             
-            room_reg = room_regulations[reg_key]
+            matched.append((room_type, room.get("area", 0), room.get("width", 0), room_reg))
+        
+        if len(matched) >= ROOM_VECTORIZE_MIN:
+            area_short, width_short = self._room_shortfalls_vectorized(matched)
+        else:
+            area_short = [area < reg[0] for _, area, _, reg in matched]
+            width_short = [width < reg[1] for _, _, width, reg in matched]
+        
+        for (room_type, room_area, room_width, room_reg), small, narrow in zip(
+            matched, area_short, width_short
+        ):
+            min_area, min_width, regulation = room_reg
+            title = room_type.title()
             
             # Check minimum area
-            min_area = room_reg.get("min_area", 0)
-            if room_area < min_area:
-                results["violations"].append({
-                    "rule": f"{room_type.title()} Size",
-                    "message": f"{room_type.title()} area {room_area}sq.ft is less than minimum {min_area}sq.ft",
-                    "regulation": room_reg["regulation"],
+            if small:
+                add_violation({
+                    "rule": f"{title} Size",
+                    "message": f"{title} area {room_area}sq.ft is less than minimum {min_area}sq.ft",
+                    "regulation": regulation,
                     "severity": "ERROR"
                 })
             else:
-                results["passed_checks"].append({
-                    "rule": f"{room_type.title()} Size",
-                    "message": f"{room_type.title()} area meets minimum requirement",
-                    "regulation": room_reg["regulation"]
+                add_pass(room_size_passes.get(room_type) or {
+                    "rule": f"{title} Size",
+                    "message": f"{title} area meets minimum requirement",
+                    "regulation": regulation
                 })
             
             # Check minimum width
-            min_width = room_reg.get("min_width", 0)
-            if room_width < min_width:
-                results["violations"].append({
-                    "rule": f"{room_type.title()} Width",
-                    "message": f"{room_type.title()} width {room_width}ft is less than minimum {min_width}ft",
-                    "regulation": room_reg["regulation"],
+            if narrow:
+                add_violation({
+                    "rule": f"{title} Width",
+                    "message": f"{title} width {room_width}ft is less than minimum {min_width}ft",
+                    "regulation": regulation,
                     "severity": "ERROR"
                 })
     
+    @staticmethod
+    def _room_shortfalls_vectorized(
+        matched: List[Tuple[str, Any, Any, Tuple[float, float, str]]]
+    ) -> Tuple[List[bool], List[bool]]:
+        """
+        Boolean arrays of rooms below their minimum area and minimum width,
+        compared in one NumPy pass over the matched rooms.
+        """
+        count = len(matched)
+        areas = np.fromiter((room[1] for room in matched), dtype=float, count=count)
+        widths = np.fromiter((room[2] for room in matched), dtype=float, count=count)
+        min_areas = np.fromiter((room[3][0] for room in matched), dtype=float, count=count)
+        min_widths = np.fromiter((room[3][1] for room in matched), dtype=float, count=count)
+        return (areas < min_areas).tolist(), (widths < min_widths).tolist()
+    
     def _validate_ventilation(
         self,
         building_data: Dict[str, Any],
@@ -372,17 +657,7 @@ class UDAHouseValidator:
     ) -> None:
         """Validate ventilation requirements."""
         # This is a simplified check - would need more detailed room data
-        results["recommendations"].append({
-            "category": "Ventilation",
-            "message": "Ensure all habitable rooms have minimum 10% window area for natural ventilation",
-            "regulation": "UDA Regulation 6.1.1"
-        })
-        
-        results["recommendations"].append({
-            "category": "Ventilation",
-            "message": "Provide cross ventilation in all bedrooms and living areas",
-            "regulation": "UDA Regulation 6.2.1"
-        })
+        results["recommendations"].extend(VENTILATION_RECOMMENDATIONS)
     
     def _validate_parking(
         self,
@@ -391,38 +666,34 @@ class UDAHouseValidator:
     ) -> None:
         """Validate parking requirements."""
         parking_spaces = building_data.get("parking_spaces", 0)
-        min_parking = self.regulations["parking"]["residential"]["min_spaces"]
+        min_parking = self._min_parking
         
         if parking_spaces < min_parking:
             results["violations"].append({
                 "rule": "Parking",
                 "message": f"Insufficient parking spaces. Minimum {min_parking} space(s) required",
-                "regulation": self.regulations["parking"]["residential"]["regulation"],
+                "regulation": self._parking_reg_id,
                 "severity": "ERROR"
             })
         else:
             results["passed_checks"].append({
                 "rule": "Parking",
                 "message": f"Parking requirement met ({parking_spaces} space(s))",
-                "regulation": self.regulations["parking"]["residential"]["regulation"]
+                "regulation": self._parking_reg_id
             })
     
     def get_regulations_summary(self) -> Dict[str, Any]:
         """Get a summary of all UDA house regulations."""
         return {
             "regulation_categories": list(self.regulations.keys()),
-            "regulations": self.regulations,
+            "regulations": _thaw(self.regulations),
             "version": "UDA Sri Lanka 2024",
             "applicable_to": "Residential houses and small-scale residential buildings"
         }
 
 
 # Singleton instance
-_uda_validator = None
-
+@cache
 def get_uda_validator() -> UDAHouseValidator:
     """Get or create UDA house validator instance."""
-    global _uda_validator
-    if _uda_validator is None:
-        _uda_validator = UDAHouseValidator()
-    return _uda_validator
+    return UDAHouseValidator()
@@ -2,12 +2,105 @@
 Validation Service for UDA (Urban Development Authority) compliance checking.
 Implements Sri Lankan building regulations and zoning rules.
 """
-from typing import Dict, Any, List, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 from decimal import Decimal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Distinct project field combinations whose rule outcomes are memoized
+VALIDATION_CACHE_SIZE = 1024
+
+_RESULT_KEYS = ("rule_id", "description", "severity", "is_valid", "message")
+
+# Minimum setbacks (meters)
+MIN_SETBACK_FRONT = 3.0
+MIN_SETBACK_SIDE = 1.5
+MIN_SETBACK_REAR = 3.0
+
+# Per-project-type limits, built once at import (read-only)
+
+# Maximum coverage ratios by project type
+_MAX_COVERAGE = MappingProxyType({
+    'RESIDENTIAL': 0.60,  # 60%
+    'COMMERCIAL': 0.70,   # 70%
+    'INDUSTRIAL': 0.65,   # 65%
+    'MIXED_USE': 0.65,    # 65%
+    'INSTITUTIONAL': 0.55  # 55%
+})
+
+# Maximum FAR by project type; Colombo has higher FAR limits
+_MAX_FAR_COLOMBO = MappingProxyType({
+    'RESIDENTIAL': 3.0,
+    'COMMERCIAL': 4.0,
+    'INDUSTRIAL': 2.5,
+    'MIXED_USE': 3.5,
+    'INSTITUTIONAL': 2.0
+})
+_MAX_FAR_OTHER = MappingProxyType({
+    'RESIDENTIAL': 2.5,
+    'COMMERCIAL': 3.0,
+    'INDUSTRIAL': 2.0,
+    'MIXED_USE': 2.75,
+    'INSTITUTIONAL': 1.5
+})
+
+# Maximum heights by project type (in meters)
+_MAX_HEIGHT_COLOMBO = MappingProxyType({
+    'RESIDENTIAL': 45.0,  # ~15 floors
+    'COMMERCIAL': 60.0,   # ~20 floors
+    'INDUSTRIAL': 30.0,   # ~10 floors
+    'MIXED_USE': 50.0,    # ~16 floors
+    'INSTITUTIONAL': 30.0  # ~10 floors
+})
+_MAX_HEIGHT_OTHER = MappingProxyType({
+    'RESIDENTIAL': 30.0,  # ~10 floors
+    'COMMERCIAL': 45.0,   # ~15 floors
+    'INDUSTRIAL': 24.0,   # ~8 floors
+    'MIXED_USE': 36.0,    # ~12 floors
+    'INSTITUTIONAL': 24.0  # ~8 floors
+})
+
+# Minimum open space ratios
+_MIN_OPEN_SPACE = MappingProxyType({
+    'RESIDENTIAL': 0.15,   # 15%
+    'COMMERCIAL': 0.10,    # 10%
+    'INDUSTRIAL': 0.20,    # 20%
+    'MIXED_USE': 0.15,     # 15%
+    'INSTITUTIONAL': 0.25   # 25%
+})
+
+# Parking requirements per 100m² of floor area
+_PARKING_PER_100 = MappingProxyType({
+    'RESIDENTIAL': 1.0,    # 1 space per 100m²
+    'COMMERCIAL': 2.5,     # 2.5 spaces per 100m²
+    'INDUSTRIAL': 1.5,     # 1.5 spaces per 100m²
+    'MIXED_USE': 2.0,      # 2 spaces per 100m²
+    'INSTITUTIONAL': 1.0    # 1 space per 100m²
+})
+
+# Every project_data key the rules read, with its default
+_PROJECT_FIELD_DEFAULTS = (
+    ('setback_front', 0),
+    ('setback_side', 0),
+    ('setback_rear', 0),
+    ('site_area', 0),
+    ('building_footprint', 0),
+    ('total_floor_area', 0),
+    ('building_height', 0),
+    ('open_space_area', 0),
+    ('parking_spaces', 0),
+    ('project_type', 'RESIDENTIAL'),
+    ('district', 'COLOMBO'),
+)
+
+
+def extract_project_fields(project_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Read every field the rules need from project_data, once."""
+    return {key: project_data.get(key, default) for key, default in _PROJECT_FIELD_DEFAULTS}
+
 
 class ValidationRule:
     """Base class for validation rules."""
@@ -24,6 +117,24 @@ class ValidationRule:
         Returns:
             Tuple of (is_valid, message)
         """
+        fields = extract_project_fields(project_data)
+        is_valid, message = self.check(fields)
+        if message is None:
+            message = self.success_message(fields)
+        return is_valid, message
+    
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Validate the rule against fields from extract_project_fields.
+        
+        Returns:
+            Tuple of (is_valid, message); message is None when the rule
+            passes, see success_message
+        """
+        raise NotImplementedError
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        """Message for a passing check, only formatted when it is reported."""
         raise NotImplementedError
 
 
@@ -37,15 +148,19 @@ class SetbackValidation(ValidationRule):
             "ERROR"
         )
     
-    def validate(self, project_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Check if setbacks meet minimum requirements."""
-        setback_front = project_data.get('setback_front', 0)
-        setback_side = project_data.get('setback_side', 0)
-        setback_rear = project_data.get('setback_rear', 0)
+        setback_front = fields['setback_front']
+        setback_side = fields['setback_side']
+        setback_rear = fields['setback_rear']
+        
+        min_front = MIN_SETBACK_FRONT
+        min_side = MIN_SETBACK_SIDE
+        min_rear = MIN_SETBACK_REAR
         
-        min_front = 3.0  # meters
-        min_side = 1.5   # meters
-        min_rear = 3.0   # meters
+        # Common case: all three setbacks pass in one comparison chain
+        if setback_front >= min_front and setback_side >= min_side and setback_rear >= min_rear:
+            return True, None
         
         issues = []
         
@@ -61,7 +176,10 @@ class SetbackValidation(ValidationRule):
         if issues:
             return False, "; ".join(issues)
         
-        return True, "Setback requirements met"
+        return True, None
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        return "Setback requirements met"
 
 
 class BuildingCoverageValidation(ValidationRule):
@@ -74,30 +192,27 @@ class BuildingCoverageValidation(ValidationRule):
             "ERROR"
         )
     
-    def validate(self, project_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Check if building coverage is within limits."""
-        site_area = project_data.get('site_area', 0)
-        building_footprint = project_data.get('building_footprint', 0)
-        project_type = project_data.get('project_type', 'RESIDENTIAL')
+        site_area = fields['site_area']
+        building_footprint = fields['building_footprint']
+        project_type = fields['project_type']
         
         if site_area == 0:
             return False, "Site area not specified"
         
-        # Maximum coverage ratios by project type
-        max_coverage = {
-            'RESIDENTIAL': 0.60,  # 60%
-            'COMMERCIAL': 0.70,   # 70%
-            'INDUSTRIAL': 0.65,   # 65%
-            'MIXED_USE': 0.65,    # 65%
-            'INSTITUTIONAL': 0.55  # 55%
-        }.get(project_type, 0.60)
+        max_coverage = _MAX_COVERAGE.get(project_type, 0.60)
         
         actual_coverage = building_footprint / site_area
         
         if actual_coverage > max_coverage:
             return False, f"Building coverage {actual_coverage*100:.1f}% exceeds maximum {max_coverage*100:.1f}% for {project_type}"
         
-        return True, f"Building coverage {actual_coverage*100:.1f}% is within limits"
+        return True, None
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        actual_coverage = fields['building_footprint'] / fields['site_area']
+        return f"Building coverage {actual_coverage*100:.1f}% is within limits"
 
 
 class FloorAreaRatioValidation(ValidationRule):
@@ -110,41 +225,32 @@ class FloorAreaRatioValidation(ValidationRule):
             "ERROR"
         )
     
-    def validate(self, project_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Check if FAR is within limits."""
-        site_area = project_data.get('site_area', 0)
-        total_floor_area = project_data.get('total_floor_area', 0)
-        project_type = project_data.get('project_type', 'RESIDENTIAL')
-        district = project_data.get('district', 'COLOMBO')
+        site_area = fields['site_area']
+        total_floor_area = fields['total_floor_area']
+        project_type = fields['project_type']
+        district = fields['district']
         
         if site_area == 0:
             return False, "Site area not specified"
         
         # Maximum FAR by project type and district
-        # Colombo has higher FAR limits
         if district.upper() == 'COLOMBO':
-            max_far = {
-                'RESIDENTIAL': 3.0,
-                'COMMERCIAL': 4.0,
-                'INDUSTRIAL': 2.5,
-                'MIXED_USE': 3.5,
-                'INSTITUTIONAL': 2.0
-            }.get(project_type, 2.5)
+            max_far = _MAX_FAR_COLOMBO.get(project_type, 2.5)
         else:
-            max_far = {
-                'RESIDENTIAL': 2.5,
-                'COMMERCIAL': 3.0,
-                'INDUSTRIAL': 2.0,
-                'MIXED_USE': 2.75,
-                'INSTITUTIONAL': 1.5
-            }.get(project_type, 2.0)
+            max_far = _MAX_FAR_OTHER.get(project_type, 2.0)
         
         actual_far = total_floor_area / site_area
         
         if actual_far > max_far:
             return False, f"FAR {actual_far:.2f} exceeds maximum {max_far:.2f} for {project_type} in {district}"
         
-        return True, f"FAR {actual_far:.2f} is within limits"
+        return True, None
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        actual_far = fields['total_floor_area'] / fields['site_area']
+        return f"FAR {actual_far:.2f} is within limits"
 
 
 class BuildingHeightValidation(ValidationRule):
@@ -157,34 +263,25 @@ class BuildingHeightValidation(ValidationRule):
             "ERROR"
         )
     
-    def validate(self, project_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Check if building height is within limits."""
-        building_height = project_data.get('building_height', 0)
-        project_type = project_data.get('project_type', 'RESIDENTIAL')
-        district = project_data.get('district', 'COLOMBO')
+        building_height = fields['building_height']
+        project_type = fields['project_type']
+        district = fields['district']
         
-        # Maximum heights by project type (in meters)
+        # Maximum heights by project type and district (in meters)
         if district.upper() == 'COLOMBO':
-            max_height = {
-                'RESIDENTIAL': 45.0,  # ~15 floors
-                'COMMERCIAL': 60.0,   # ~20 floors
-                'INDUSTRIAL': 30.0,   # ~10 floors
-                'MIXED_USE': 50.0,    # ~16 floors
-                'INSTITUTIONAL': 30.0  # ~10 floors
-            }.get(project_type, 30.0)
+            max_height = _MAX_HEIGHT_COLOMBO.get(project_type, 30.0)
         else:
-            max_height = {
-                'RESIDENTIAL': 30.0,  # ~10 floors
-                'COMMERCIAL': 45.0,   # ~15 floors
-                'INDUSTRIAL': 24.0,   # ~8 floors
-                'MIXED_USE': 36.0,    # ~12 floors
-                'INSTITUTIONAL': 24.0  # ~8 floors
-            }.get(project_type, 24.0)
+            max_height = _MAX_HEIGHT_OTHER.get(project_type, 24.0)
         
         if building_height > max_height:
             return False, f"Building height {building_height}m exceeds maximum {max_height}m for {project_type} in {district}"
         
-        return True, f"Building height {building_height}m is within limits"
+        return True, None
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        return f"Building height {fields['building_height']}m is within limits"
 
 
 class OpenSpaceValidation(ValidationRule):
@@ -197,30 +294,26 @@ class OpenSpaceValidation(ValidationRule):
             "WARNING"
         )
     
-    def validate(self, project_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Check if adequate open space is provided."""
-        site_area = project_data.get('site_area', 0)
-        open_space_area = project_data.get('open_space_area', 0)
-        project_type = project_data.get('project_type', 'RESIDENTIAL')
+        site_area = fields['site_area']
+        open_space_area = fields['open_space_area']
+        project_type = fields['project_type']
         
         if site_area == 0:
             return False, "Site area not specified"
         
-        # Minimum open space ratios
-        min_open_space_ratio = {
-            'RESIDENTIAL': 0.15,   # 15%
-            'COMMERCIAL': 0.10,    # 10%
-            'INDUSTRIAL': 0.20,    # 20%
-            'MIXED_USE': 0.15,     # 15%
-            'INSTITUTIONAL': 0.25   # 25%
-        }.get(project_type, 0.15)
+        min_open_space_ratio = _MIN_OPEN_SPACE.get(project_type, 0.15)
         
         required_open_space = site_area * min_open_space_ratio
         
         if open_space_area < required_open_space:
             return False, f"Open space {open_space_area}m² is less than minimum required {required_open_space:.1f}m² ({min_open_space_ratio*100}%)"
         
-        return True, f"Open space {open_space_area}m² meets minimum requirements"
+        return True, None
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        return f"Open space {fields['open_space_area']}m² meets minimum requirements"
 
 
 class ParkingValidation(ValidationRule):
@@ -233,27 +326,23 @@ class ParkingValidation(ValidationRule):
             "WARNING"
         )
     
-    def validate(self, project_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def check(self, fields: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Check if adequate parking is provided."""
-        parking_spaces = project_data.get('parking_spaces', 0)
-        project_type = project_data.get('project_type', 'RESIDENTIAL')
-        total_floor_area = project_data.get('total_floor_area', 0)
-        
-        # Parking requirements per 100m² of floor area
-        required_per_100m2 = {
-            'RESIDENTIAL': 1.0,    # 1 space per 100m²
-            'COMMERCIAL': 2.5,     # 2.5 spaces per 100m²
-            'INDUSTRIAL': 1.5,     # 1.5 spaces per 100m²
-            'MIXED_USE': 2.0,      # 2 spaces per 100m²
-            'INSTITUTIONAL': 1.0    # 1 space per 100m²
-        }.get(project_type, 1.0)
+        parking_spaces = fields['parking_spaces']
+        project_type = fields['project_type']
+        total_floor_area = fields['total_floor_area']
+        
+        required_per_100m2 = _PARKING_PER_100.get(project_type, 1.0)
         
         required_spaces = int((total_floor_area / 100) * required_per_100m2)
         
         if parking_spaces < required_spaces:
             return False, f"Parking spaces {parking_spaces} is less than minimum required {required_spaces}"
         
-        return True, f"Parking spaces {parking_spaces} meets requirements"
+        return True, None
+    
+    def success_message(self, fields: Dict[str, Any]) -> str:
+        return f"Parking spaces {fields['parking_spaces']} meets requirements"
 
 
 class ValidationService:
@@ -269,56 +358,61 @@ class ValidationService:
             OpenSpaceValidation(),
             ParkingValidation()
         ]
+        # (rule_id, description, severity, check, success_message) per rule,
+        # so the rule loop works on locals instead of rule attributes
+        self._rule_table = tuple(
+            (rule.rule_id, rule.description, rule.severity, rule.check, rule.success_message)
+            for rule in self.rules
+        )
+        # Rule outcomes are a pure function of the extracted fields
+        self._evaluate_rules_cached = lru_cache(maxsize=VALIDATION_CACHE_SIZE)(
+            self._evaluate_rules_for_key
+        )
     
-    def validate_project(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+    def validate_project(self, project_data: Dict[str, Any], verbose: bool = True) -> Dict[str, Any]:
         """
         Validate a project against all UDA rules.
         
         Args:
             project_data: Dictionary with project information
+            verbose: Include messages for passing checks ("info" and the
+                passed detailed results); without it they are never formatted
             
         Returns:
             Validation report with results
         """
-        results = []
-        errors = []
-        warnings = []
-        info = []
+        # Every rule reads from the same fields, extracted once
+        fields = extract_project_fields(project_data)
+        
+        # Unchanged projects (preview/autosave re-validation) hit the cache.
+        # Values are keyed with their type and repr, since equal values can
+        # still format differently: 3 == 3.0 and Decimal('3.0') ==
+        # Decimal('3.00'), but "3m" != "3.0m" != "3.00m".
+        key = tuple((type(value), repr(value), value) for value in fields.values())
+        try:
+            hash(key)
+        except TypeError:
+            key = None
+        
+        if key is None or project_data.get('_dirty'):
+            outcome = self._evaluate_rules(fields, verbose)
+        else:
+            outcome = self._evaluate_rules_cached(key, verbose)
         
-        for rule in self.rules:
-            try:
-                is_valid, message = rule.validate(project_data)
-                
-                result = {
-                    "rule_id": rule.rule_id,
-                    "description": rule.description,
-                    "severity": rule.severity,
-                    "is_valid": is_valid,
-                    "message": message
-                }
-                
-                results.append(result)
-                
-                if not is_valid:
-                    if rule.severity == "ERROR":
-                        errors.append(message)
-                    elif rule.severity == "WARNING":
-                        warnings.append(message)
-                else:
-                    info.append(message)
-                    
-            except Exception as e:
-                logger.error(f"Error validating rule {rule.rule_id}: {e}")
-                errors.append(f"Validation error for {rule.description}: {str(e)}")
+        result_rows, errors, warnings, info, passed_checks, compliance_score = outcome
+        results = [dict(zip(_RESULT_KEYS, row)) for row in result_rows]
+        errors = list(errors)
+        warnings = list(warnings)
+        info = list(info)
         
         is_compliant = len(errors) == 0
         
         return {
             "is_compliant": is_compliant,
-            "compliance_score": self._calculate_compliance_score(results),
+            "compliance_score": compliance_score,
             "total_checks": len(results),
-            "passed_checks": len([r for r in results if r["is_valid"]]),
-            "failed_checks": len([r for r in results if not r["is_valid"]]),
+            "passed_checks": passed_checks,
+            "failed_checks": len(results) - passed_checks,
             "errors": errors,
             "warnings": warnings,
             "info": info,
@@ -326,23 +420,71 @@ class ValidationService:
             "summary": self._generate_summary(is_compliant, errors, warnings)
         }
     
-    def _calculate_compliance_score(self, results: List[Dict]) -> float:
-        """Calculate compliance score (0-100)."""
-        if not results:
-            return 0.0
+    def _evaluate_rules_for_key(
+        self,
+        key: Tuple[Tuple[type, str, Any], ...],
+        verbose: bool
+    ) -> Tuple[tuple, tuple, tuple, tuple, int, float]:
+        """_evaluate_rules for a (type, repr, value) fields key built by validate_project."""
+        return self._evaluate_rules(dict(zip(
+            (name for name, _ in _PROJECT_FIELD_DEFAULTS),
+            (value for _, _, value in key)
+        )), verbose)
+    
+    def _evaluate_rules(
+        self,
+        fields: Dict[str, Any],
+        verbose: bool = True
+    ) -> Tuple[tuple, tuple, tuple, tuple, int, float]:
+        """
+        Run every rule against the extracted fields, counting passes and
+        the severity-weighted compliance score (0-100) in the same pass.
         
+        Returns:
+            Immutable (results, errors, warnings, info, passed_checks,
+            compliance_score); each result is a tuple in _RESULT_KEYS order
+        """
+        results = []
+        errors = []
+        warnings = []
+        info = []
+        passed_checks = 0
         total_weight = 0
         passed_weight = 0
         
-        for result in results:
-            # Weight by severity
-            weight = 3 if result["severity"] == "ERROR" else 1
-            total_weight += weight
-            
-            if result["is_valid"]:
-                passed_weight += weight
+        for rule_id, description, severity, check, success_message in self._rule_table:
+            try:
+                is_valid, message = check(fields)
+                if message is None and verbose:
+                    message = success_message(fields)
+                
+                results.append((rule_id, description, severity, is_valid, message))
+                
+                # Weight by severity
+                weight = 3 if severity == "ERROR" else 1
+                total_weight += weight
+                if is_valid:
+                    passed_checks += 1
+                    passed_weight += weight
+                
+                if not is_valid:
+                    if severity == "ERROR":
+                        errors.append(message)
+                    elif severity == "WARNING":
+                        warnings.append(message)
+                elif message is not None:
+                    info.append(message)
+                    
+            except Exception as e:
+                logger.error(f"Error validating rule {rule_id}: {e}")
+                errors.append(f"Validation error for {description}: {str(e)}")
         
-        return round((passed_weight / total_weight) * 100, 2) if total_weight > 0 else 0.0
+        compliance_score = round((passed_weight / total_weight) * 100, 2) if total_weight > 0 else 0.0
+        
+        return (
+            tuple(results), tuple(errors), tuple(warnings), tuple(info),
+            passed_checks, compliance_score
+        )
     
     def _generate_summary(self, is_compliant: bool, errors: List[str], warnings: List[str]) -> str:
         """Generate human-readable summary."""
@@ -1,7 +1,9 @@
 """
 Blockchain utilities for automatic compliance logging.
 """
+import asyncio
 import logging
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models.project import Project
 from app.models.blockchain_record import BlockchainRecord, RecordType
@@ -24,7 +26,7 @@ async def store_project_record_async(
     Designed to be used with FastAPI BackgroundTasks.
     """
     try:
-        if not blockchain_service.is_available() or not ipfs_service.is_available():
+        if not blockchain_service.is_available() or not await ipfs_service.is_available():
             logger.warning(f"Blockchain/IPFS unavailable. Skipping auto-log for project {project_id}")
             return
 
@@ -49,6 +51,39 @@ async def store_project_record_async(
 # Revised approach: We will implement the logic to run largely independent of the request scope DB.
 from app.database import SessionLocal
 
+# Background records are coalesced: one consumer drains up to
+# RECORD_BATCH_SIZE queued records (or whatever arrived within
+# RECORD_BATCH_WINDOW seconds of the first) and writes them together
+RECORD_BATCH_SIZE = 32
+RECORD_BATCH_WINDOW = 0.5  # seconds
+
+_record_queue: Optional[asyncio.Queue] = None
+_record_worker: Optional[asyncio.Task] = None
+
+
+def start_record_worker() -> None:
+    """Start the background record consumer on the running event loop."""
+    global _record_queue, _record_worker
+    if _record_worker is not None and not _record_worker.done():
+        return
+    _record_queue = asyncio.Queue()
+    _record_worker = asyncio.create_task(_consume_records(_record_queue))
+
+
+async def stop_record_worker(timeout: float = 30.0) -> None:
+    """Flush queued records (up to timeout seconds) and stop the consumer."""
+    global _record_queue, _record_worker
+    if _record_worker is None:
+        return
+    try:
+        await asyncio.wait_for(_record_queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Dropping {_record_queue.qsize()} unflushed blockchain records on shutdown")
+    _record_worker.cancel()
+    _record_queue = None
+    _record_worker = None
+
+
 async def store_project_record_background(
     project_data: dict,
     record_type: str,
@@ -57,41 +92,111 @@ async def store_project_record_background(
 ):
     """
     Store record on blockchain running in background.
-    Manages its own DB session.
+    Queues the record for the batch consumer and returns immediately.
     """
-    db = SessionLocal()
+    # Reject bad types before anything goes on-chain, so a stored
+    # transaction can never fail to get its DB row
     try:
-        logger.info(f"Starting background blockchain log for project {project_data['id']} - {record_type}")
-        
-        # 1. Calculate Hash
-        data_hash = blockchain_service.calculate_hash(project_data)
+        RecordType(record_type)
+    except ValueError:
+        logger.error(f"Not logging project {project_data['id']}: unknown record type {record_type!r}")
+        return
+    
+    start_record_worker()
+    logger.info(f"Queued background blockchain log for project {project_data['id']} - {record_type}")
+    _record_queue.put_nowait((project_data, record_type, user_id, metadata))
+
+
+async def _consume_records(queue: asyncio.Queue) -> None:
+    """Drain the record queue in batches until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + RECORD_BATCH_WINDOW
+        while len(batch) < RECORD_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
         
-        # 2. Upload to IPFS
-        ipfs_hash = await ipfs_service.upload_json(
-            project_data,
-            f"project_{project_data['id']}_{record_type}.json"
+        try:
+            await _store_record_batch(batch)
+        except Exception as e:
+            logger.error(f"Background task failed: {e}")
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def _prepare_record(project_data: dict, record_type: str) -> Optional[Tuple[str, str]]:
+    """Serialize, hash and pin one record; (data_hash, ipfs_hash) or None."""
+    # 1. Serialize once and hash; the same canonical bytes go to IPFS, so
+    # the pinned file hashes to data_hash
+    payload = blockchain_service.serialize(project_data)
+    data_hash = blockchain_service.hash_payload(payload)
+    
+    # 2. Upload to IPFS, reusing the CID if this content was pinned already
+    try:
+        ipfs_hash = await ipfs_service.upload_bytes(
+            payload,
+            f"project_{project_data['id']}_{record_type}.json",
+            content_hash=data_hash
         )
+    except Exception as e:
+        logger.error(f"Failed to hash/upload record for project {project_data['id']}: {e}")
+        return None
+    
+    if not ipfs_hash:
+        logger.error("Failed to upload to IPFS")
+        return None
+    
+    return data_hash, ipfs_hash
+
+
+async def _store_record_batch(batch: List[tuple]) -> None:
+    """
+    Store a batch of queued records: IPFS uploads run concurrently, the
+    transactions go out one at a time (each takes the next account nonce)
+    and every stored record is saved in a single DB commit. A failure in
+    one record never drops the others.
+    """
+    prepared = await asyncio.gather(*(
+        _prepare_record(project_data, record_type)
+        for project_data, record_type, _, _ in batch
+    ), return_exceptions=True)
+    
+    rows = []
+    for (project_data, record_type, user_id, metadata), hashes in zip(batch, prepared):
+        if isinstance(hashes, Exception):
+            logger.error(f"Failed to prepare record for project {project_data['id']}: {hashes}")
+            continue
+        if hashes is None:
+            continue
+        data_hash, ipfs_hash = hashes
         
-        if not ipfs_hash:
-            logger.error("Failed to upload to IPFS")
-            return
-            
-        # 3. Store on Blockchain
-        tx_hash = await blockchain_service.store_record(
-            project_id=project_data['id'],
-            ipfs_hash=ipfs_hash,
-            data_hash=data_hash,
-            record_type=record_type,
-            metadata=metadata or {}
-        )
+        try:
+            # 3. Store on Blockchain
+            tx_hash = await blockchain_service.store_record(
+                project_id=project_data['id'],
+                ipfs_hash=ipfs_hash,
+                data_hash=data_hash,
+                record_type=record_type,
+                metadata=metadata or {}
+            )
+        except Exception as e:
+            logger.error(f"Failed to store project {project_data['id']} on blockchain: {e}")
+            continue
         
         if not tx_hash:
             logger.error("Failed to store on blockchain")
-            return
-            
+            continue
+        
         # 4. Save to DB (Persistent Record)
         # We assume the project exists.
-        blockchain_record = BlockchainRecord(
+        rows.append(dict(
             project_id=project_data['id'],
             transaction_hash=tx_hash,
             ipfs_hash=ipfs_hash,
@@ -99,14 +204,31 @@ async def store_project_record_background(
             data_hash=data_hash,
             record_metadata=metadata,
             created_by=user_id
-        )
-        
-        db.add(blockchain_record)
-        db.commit()
-        
-        logger.info(f"Auto-logged blockchain record: {tx_hash}")
-        
+        ))
+    
+    if not rows:
+        return
+    
+    try:
+        # Commits on exit and returns the connection to the pool
+        with SessionLocal.begin() as db:
+            db.add_all([BlockchainRecord(**row) for row in rows])
+        saved = rows
+    except Exception as e:
+        # These transactions are already mined: save what we can row by row
+        logger.error(f"Bulk save of {len(rows)} blockchain records failed, saving individually: {e}")
+        saved = [row for row in rows if _save_record_row(row)]
+    
+    for row in saved:
+        logger.info(f"Auto-logged blockchain record: {row['transaction_hash']}")
+
+
+def _save_record_row(row: dict) -> bool:
+    """Save one BlockchainRecord in its own transaction; True on success."""
+    try:
+        with SessionLocal.begin() as db:
+            db.add(BlockchainRecord(**row))
+        return True
     except Exception as e:
-        logger.error(f"Background task failed: {e}")
-    finally:
-        db.close()
+        logger.error(f"Failed to save blockchain record {row['transaction_hash']}: {e}")
+        return False
@@ -1,17 +1,39 @@
 """
 Blender export script for IFC, DXF, and other formats.
+
+Run inside Blender (blender -b --python export_formats.py -- ...) to export
+in that process; with --parallel, or when run with plain Python, each format
+is exported by its own background Blender process instead.
 """
-import bpy
+import os
 import sys
 import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import bpy
+except ImportError:
+    # Plain Python: only the parallel dispatcher is available
+    bpy = None
+
+# Resolve the export operators once rather than through the bpy.ops proxy on
+# every call. The IFC operator only works once the BlenderBIM add-on is
+# enabled; calling it without the add-on raises, and export_ifc reports that.
+if bpy is not None:
+    _IFC = bpy.ops.export_ifc.bim
+    _DXF = bpy.ops.export_scene.dxf
+    _FBX = bpy.ops.export_scene.fbx
+else:
+    _IFC = _DXF = _FBX = None
+
 
 def export_ifc(output_path):
     """Export to IFC format."""
     # Note: Requires BlenderBIM add-on
     try:
-        bpy.ops.export_ifc.bim(filepath=str(output_path))
+        _IFC(filepath=str(output_path))
         print(f"Exported IFC to {output_path}")
         return True
     except Exception as e:
@@ -22,7 +44,7 @@ def export_ifc(output_path):
 def export_dxf(output_path):
     """Export to DXF format."""
     try:
-        bpy.ops.export_scene.dxf(filepath=str(output_path))
+        _DXF(filepath=str(output_path))
         print(f"Exported DXF to {output_path}")
         return True
     except Exception as e:
@@ -33,7 +55,9 @@ def export_dxf(output_path):
 def export_fbx(output_path):
     """Export to FBX format."""
     try:
-        bpy.ops.export_scene.fbx(filepath=str(output_path))
+        # Generated scenes are static: skip the per-frame animation bake, which
+        # re-evaluates the whole depsgraph for every frame in the scene range
+        _FBX(filepath=str(output_path), use_mesh_modifiers=True, bake_anim=False)
         print(f"Exported FBX to {output_path}")
         return True
     except Exception as e:
@@ -41,6 +65,55 @@ def export_fbx(output_path):
         return False
 
 
+EXPORTERS = {
+    'IFC': export_ifc,
+    'DXF': export_dxf,
+    'FBX': export_fbx,
+}
+
+
+def blender_executable():
+    """The running Blender binary, else BLENDER_EXECUTABLE_PATH or 'blender'."""
+    if bpy is not None and bpy.app.binary_path:
+        return bpy.app.binary_path
+    return os.getenv('BLENDER_EXECUTABLE_PATH', 'blender')
+
+
+def available_cpus():
+    """CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def export_format_subprocess(args, format_name):
+    """Export one format in a separate background Blender; True on success."""
+    cmd = [
+        blender_executable(),
+        '--background',
+        '--python', str(Path(__file__).resolve()),
+        '--',
+        '--blend-file', args.blend_file,
+        '--output-dir', args.output_dir,
+        '--formats', format_name,
+        '--job-id', args.job_id,
+    ]
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    sys.stdout.write(completed.stdout)
+    if completed.returncode != 0:
+        print(f"{format_name} export process failed ({completed.returncode}): {completed.stderr[-2000:]}")
+    return completed.returncode == 0
+
+
+def export_parallel(args, formats):
+    """Export every format concurrently, one Blender process per format."""
+    workers = max(1, min(len(formats), available_cpus()))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = pool.map(lambda format_name: export_format_subprocess(args, format_name), formats)
+        return {format_name.lower(): ok for format_name, ok in zip(formats, outcomes)}
+
+
 def main():
     """Main export function."""
     parser = argparse.ArgumentParser(description='Export Blender scene to various formats')
@@ -48,35 +121,49 @@ def main():
     parser.add_argument('--output-dir', type=str, required=True, help='Output directory')
     parser.add_argument('--formats', type=str, required=True, help='Comma-separated export formats')
     parser.add_argument('--job-id', type=str, required=True, help='Job ID for file naming')
-    
-    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser.add_argument('--parallel', action='store_true', help='Export each format in its own Blender process')
+
+    if bpy is not None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    else:
+        argv = sys.argv[1:]
     args = parser.parse_args(argv)
-    
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    formats = []
+    for format_name in args.formats.split(','):
+        format_name = format_name.strip().upper()
+        if format_name in EXPORTERS:
+            formats.append(format_name)
+        else:
+            print(f"Unsupported format: {format_name}")
+
+    # Exporters are single-threaded; separate processes export side by side
+    if bpy is None or (args.parallel and len(formats) > 1):
+        results = export_parallel(args, formats)
+        print(f"Export complete. Results: {results}")
+        return results
+
     # Load blend file
     bpy.ops.wm.open_mainfile(filepath=args.blend_file)
     print(f"Loaded blend file: {args.blend_file}")
-    
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    formats = args.formats.split(',')
+
+    # Evaluate the scene once up front; exporters then reuse the evaluated
+    # meshes instead of each triggering its own depsgraph update
+    bpy.context.evaluated_depsgraph_get()
+
     results = {}
-    
+
     for format_name in formats:
-        format_name = format_name.strip().upper()
         output_path = output_dir / f"{args.job_id}.{format_name.lower()}"
-        
-        if format_name == 'IFC':
-            results['ifc'] = export_ifc(output_path)
-        elif format_name == 'DXF':
-            results['dxf'] = export_dxf(output_path)
-        elif format_name == 'FBX':
-            results['fbx'] = export_fbx(output_path)
-        else:
-            print(f"Unsupported format: {format_name}")
-    
+        results[format_name.lower()] = EXPORTERS[format_name](output_path)
+
     print(f"Export complete. Results: {results}")
+    return results
 
 
 if __name__ == "__main__":
-    main()
+    results = main()
+    sys.exit(0 if all(results.values()) else 1)
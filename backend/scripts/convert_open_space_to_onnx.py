@@ -0,0 +1,88 @@
+"""
+One-time conversion of the open space sklearn models to a single ONNX graph.
+
+Combines clf_requires_open_space.pkl and reg_min_open_space_m2.pkl into
+open_space.onnx with one shared "input" and two outputs ("requires_open_space"
+and "min_open_space_m2"), which MLService runs through onnxruntime.
+
+Requires: pip install skl2onnx onnx
+"""
+import pickle
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import onnx
+from onnx import helper
+from onnx.compose import add_prefix
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+from app.services.ml_service import CLF_MODEL_PATH, REG_MODEL_PATH, OPEN_SPACE_ONNX_PATH
+
+# Features produced by MLService._prepare_features
+NUM_FEATURES = 5
+
+
+def _to_onnx(model, prefix: str) -> onnx.ModelProto:
+    """Convert a fitted estimator and prefix every name with `prefix`."""
+    onx = convert_sklearn(
+        model,
+        initial_types=[("input", FloatTensorType([None, NUM_FEATURES]))],
+        options={id(model): {"zipmap": False}} if hasattr(model, "classes_") else None,
+    )
+    return add_prefix(onx, prefix)
+
+
+def convert():
+    """Convert both pickled models and write the merged ONNX graph."""
+    print("\n🔄 Converting open space models to ONNX...")
+
+    with open(CLF_MODEL_PATH, "rb") as f:
+        clf = pickle.load(f)
+    with open(REG_MODEL_PATH, "rb") as f:
+        reg = pickle.load(f)
+
+    clf_onnx = _to_onnx(clf, "clf_")
+    reg_onnx = _to_onnx(reg, "reg_")
+
+    # Feed the shared input into both sub-graphs and expose one output each
+    nodes = [
+        helper.make_node("Identity", ["input"], ["clf_input"]),
+        helper.make_node("Identity", ["input"], ["reg_input"]),
+        *clf_onnx.graph.node,
+        *reg_onnx.graph.node,
+        helper.make_node("Identity", ["clf_label"], ["requires_open_space"]),
+        helper.make_node("Identity", ["reg_variable"], ["min_open_space_m2"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "open_space",
+        [helper.make_tensor_value_info("input", onnx.TensorProto.FLOAT, [None, NUM_FEATURES])],
+        [
+            helper.make_tensor_value_info("requires_open_space", onnx.TensorProto.INT64, [None]),
+            helper.make_tensor_value_info("min_open_space_m2", onnx.TensorProto.FLOAT, [None, 1]),
+        ],
+        initializer=[*clf_onnx.graph.initializer, *reg_onnx.graph.initializer],
+    )
+
+    opsets = {}
+    for opset in [*clf_onnx.opset_import, *reg_onnx.opset_import]:
+        opsets[opset.domain] = max(opsets.get(opset.domain, 0), opset.version)
+
+    merged = helper.make_model(
+        graph,
+        opset_imports=[helper.make_opsetid(domain, version) for domain, version in opsets.items()],
+        producer_name="smart_city_gen",
+    )
+    merged.ir_version = max(clf_onnx.ir_version, reg_onnx.ir_version)
+    onnx.checker.check_model(merged)
+
+    onnx.save(merged, str(OPEN_SPACE_ONNX_PATH))
+    print(f"  ✅ Saved {OPEN_SPACE_ONNX_PATH}")
+
+
+if __name__ == "__main__":
+    convert()
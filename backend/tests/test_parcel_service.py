@@ -0,0 +1,40 @@
+"""
+Unit tests for Parcel Subdivision Service.
+Tests block subdivision into strip parcels and use assignment.
+"""
+import pytest
+import shapely.affinity
+from shapely.geometry import Polygon, box
+from app.services.parcel_service import parcel_service
+
+
+class TestParcelService:
+    """Test suite for ParcelSubdivisionService."""
+    
+    def test_subdivide_rotated_block(self):
+        """Test a rotated rectangular block is cut into several parcels."""
+        block = shapely.affinity.rotate(box(0, 0, 120, 60), 30, origin='centroid')
+        
+        parcels = parcel_service.subdivide_block(block)
+        
+        assert len(parcels) > 1
+        assert sum(p['area'] for p in parcels) == pytest.approx(block.area)
+    
+    def test_subdivide_irregular_block(self):
+        """Test an irregular (non-rectangular) block is cut into several parcels."""
+        block = Polygon([(0, 0), (140, 10), (150, 70), (60, 95), (-10, 60)])
+        
+        parcels = parcel_service.subdivide_block(block)
+        
+        assert len(parcels) > 1
+        assert sum(p['area'] for p in parcels) == pytest.approx(block.area)
+        assert all(block.buffer(1e-6).contains(p['geometry']) for p in parcels)
+    
+    def test_building_parcels_have_setback_footprint(self):
+        """Test building parcels get a footprint inside their parcel."""
+        parcels = parcel_service.subdivide_block(box(0, 0, 100, 50))
+        
+        buildings = [p for p in parcels if p['type'] == 'building']
+        assert buildings
+        for parcel in buildings:
+            assert parcel['geometry'].contains(parcel['building_footprint'])
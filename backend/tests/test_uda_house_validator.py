@@ -0,0 +1,72 @@
+"""
+Unit tests for UDA House Validator.
+Tests that batch validation matches single-design validation.
+"""
+import itertools
+import pytest
+from app.services.uda_house_validator import get_uda_validator
+
+NAN = float("nan")
+
+
+@pytest.fixture
+def validator():
+    return get_uda_validator()
+
+
+def _site_cases(validator):
+    """Designs on, just inside and just outside every site threshold."""
+    eps = 0.01
+    front, rear, side = validator._min_front, validator._min_rear, validator._min_side
+    plots = [
+        None,
+        {},
+        {"front_setback": front, "rear_setback": rear, "side_setback": side},
+        {"front_setback": front - eps, "rear_setback": rear, "side_setback": side},
+        {"front_setback": front, "rear_setback": rear - eps, "side_setback": side + 1},
+        {"front_setback": front + 1, "rear_setback": rear + 1, "side_setback": side - eps},
+        {"front_setback": NAN, "rear_setback": rear, "side_setback": side},
+        {"front_setback": front, "rear_setback": NAN, "side_setback": NAN},
+        {"rear_setback": rear, "side_setback": side},
+    ]
+    buildings = [
+        {},
+        {"building_coverage": validator._max_coverage, "floor_count": validator._max_floors,
+         "building_height": validator._max_height, "parking_spaces": validator._min_parking},
+        {"building_coverage": validator._max_coverage + eps, "floor_count": 1, "building_height": 10},
+        {"building_coverage": 40, "floor_count": validator._max_floors + 1, "building_height": 10},
+        {"building_coverage": 40, "floor_count": 2, "building_height": validator._max_height + eps},
+        {"building_coverage": NAN, "floor_count": 2, "building_height": NAN, "parking_spaces": NAN},
+        {"building_coverage": 50, "floor_count": 2, "building_height": 20, "parking_spaces": 1,
+         "rooms": [{"type": "Master Bedroom", "area": 120, "width": 10}, {"type": "kitchen", "area": NAN}]},
+    ]
+    return list(itertools.product(buildings, plots))
+
+
+class TestUDAHouseValidator:
+    """Test suite for UDAHouseValidator."""
+    
+    def test_validate_many_matches_single(self, validator):
+        """Test each batch report equals the single-design report."""
+        cases = _site_cases(validator)
+        buildings = [building for building, _ in cases]
+        plots = [plot for _, plot in cases]
+        
+        reports = validator.validate_many(buildings, plots)
+        
+        assert len(reports) == len(cases)
+        for (building, plot), report in zip(cases, reports):
+            assert report == validator.validate_house_design(building, plot)
+    
+    def test_validate_many_without_plots(self, validator):
+        """Test a batch without plot data matches validation with plot None."""
+        buildings = [building for building, plot in _site_cases(validator) if plot is None]
+        
+        reports = validator.validate_many(buildings)
+        
+        assert reports == [validator.validate_house_design(b, None) for b in buildings]
+    
+    def test_validate_many_rejects_mismatched_plots(self, validator):
+        """Test plots must line up with buildings."""
+        with pytest.raises(ValueError):
+            validator.validate_many([{}, {}], [None])
@@ -0,0 +1,66 @@
+"""
+Unit tests for Validation Service.
+Tests that cached rule outcomes match fresh validation.
+"""
+from decimal import Decimal
+import pytest
+from app.services.validation_service import ValidationService
+
+
+@pytest.fixture
+def service():
+    return ValidationService()
+
+
+def _project(**overrides):
+    project = {
+        'setback_front': 6.0, 'setback_side': 3.0, 'setback_rear': 3.0,
+        'site_area': 1000, 'building_footprint': 400, 'total_floor_area': 1200,
+        'building_height': 12.0, 'open_space_area': 300, 'parking_spaces': 10,
+        'project_type': 'RESIDENTIAL', 'district': 'COLOMBO'
+    }
+    project.update(overrides)
+    return project
+
+
+def _messages(report):
+    return [result['message'] for result in report['detailed_results']]
+
+
+class TestValidationCache:
+    """Test suite for ValidationService result caching."""
+    
+    def test_repeat_validation_hits_cache(self, service):
+        """Test an unchanged project is served from the cache."""
+        first = service.validate_project(_project())
+        second = service.validate_project(_project())
+        
+        assert second == first
+        assert service._evaluate_rules_cached.cache_info().hits == 1
+    
+    def test_equal_values_that_format_differently(self, service):
+        """Test 3.0 and 3.00 (and 3 and 3.0) each keep their own messages."""
+        for height in (Decimal('3.0'), Decimal('3.00'), 3, 3.0):
+            report = service.validate_project(_project(building_height=height))
+            fresh = service.validate_project(_project(building_height=height, _dirty=True))
+            
+            assert f"Building height {height}m is within limits" in _messages(report)
+            assert report == fresh
+    
+    def test_dirty_project_bypasses_cache(self, service):
+        """Test _dirty projects are always evaluated afresh."""
+        service.validate_project(_project(_dirty=True))
+        service.validate_project(_project(_dirty=True))
+        
+        info = service._evaluate_rules_cached.cache_info()
+        assert info.hits == 0 and info.misses == 0
+    
+    def test_unhashable_field_bypasses_cache(self, service):
+        """Test unhashable field values are validated without the cache."""
+        project = _project(district=['COLOMBO'])
+        
+        first = service.validate_project(project)
+        second = service.validate_project(project)
+        
+        assert second == first
+        assert service._evaluate_rules_cached.cache_info().currsize == 0